@@ -8,17 +8,27 @@ import os
 from PIL import Image
 import time
 import glob
+import html
 from dotenv import load_dotenv
-import pymysql
 
-# Carregar variáveis de ambiente
+# Carregar variáveis de ambiente antes dos módulos compartilhados (alguns leem o ambiente no import)
 load_dotenv()
 
+from churrasco_db import fetch_payment_totals, get_breaker
+from churrasco_snapshot import get_poller, change_bus
+from churrasco_events import resolve_event, event_db_config, event_key, event_overrides, event_upload_folder
+from churrasco_money import format_brl, format_brl_column, monthly_values, payment_amount, to_reais
+from churrasco_assets import VARIANTS, asset_path
+
+# Evento exibido (?evento=<id>); sem parâmetro, o evento padrão
+EVENT_ID = resolve_event(st.query_params.get('evento'))
+EVENT_OVERRIDES = event_overrides(EVENT_ID)
+
 # Configurações
-CHURRASCO_DATE = os.getenv('CHURRASCO_DATE', '2025-12-06')
-CHURRASCO_TIME = os.getenv('CHURRASCO_TIME', '18:00')
-TIMEZONE = os.getenv('CHURRASCO_TIMEZONE', 'America/Sao_Paulo')
-UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')
+CHURRASCO_DATE = EVENT_OVERRIDES.get('EVENT_DATE', os.getenv('CHURRASCO_DATE', '2025-12-06'))
+CHURRASCO_TIME = EVENT_OVERRIDES.get('EVENT_TIME', os.getenv('CHURRASCO_TIME', '18:00'))
+TIMEZONE = EVENT_OVERRIDES.get('EVENT_TZ', os.getenv('CHURRASCO_TIMEZONE', 'America/Sao_Paulo'))
+UPLOAD_FOLDER = event_upload_folder(EVENT_ID)
 IMAGE_WIDTH = 400
 IMAGE_HEIGHT = 300
 
@@ -27,9 +37,14 @@ DB_USER = os.getenv('DB_USER')
 DB_PASSWORD = os.getenv('DB_PASSWORD')
 DB_DATABASE = os.getenv('DB_DATABASE')
 DB_PORT = int(os.getenv('DB_PORT', 3306))
-DB_TABLE = os.getenv('DB_TABLE', 'confra_pagamentos')
+DB_CONFIG = event_db_config(EVENT_ID)
+DB_TABLE = DB_CONFIG['DB_TABLE']
+TOTAIS_SNAPSHOT = event_key(EVENT_ID, 'confra_pagamentos_totais')
+DB_REFRESH_INTERVAL = int(os.getenv('DB_REFRESH_INTERVAL', 5))
+CHANGE_WATCH_INTERVAL = float(os.getenv('CHANGE_WATCH_INTERVAL', 2))
 
-VALOR_MENSAL_POR_COLABORADOR = 63.07
+# Valor mensal por colaborador, em centavos (PAYMENT_AMOUNT)
+VALOR_MENSAL_POR_COLABORADOR = payment_amount(DB_CONFIG)
 
 # Configurar página
 st.set_page_config(
@@ -55,8 +70,14 @@ if 'last_upload_hash' not in st.session_state:
     st.session_state.last_upload_hash = None
 if 'database_data' not in st.session_state:
     st.session_state.database_data = None
-if 'last_db_update' not in st.session_state:
-    st.session_state.last_db_update = 0
+if 'db_version' not in st.session_state:
+    st.session_state.db_version = 0
+if st.session_state.get('db_event') != EVENT_ID:
+    # Troca de evento na mesma sessão: descarta os dados do evento anterior
+    st.session_state.db_event = EVENT_ID
+    st.session_state.database_data = None
+    st.session_state.db_version = 0
+    st.session_state.pop('db_bus_seen', None)
 
 # CSS personalizado para tema escuro
 st.markdown("""
@@ -114,6 +135,17 @@ st.markdown("""
         background-color: #0E1117;
     }
     
+    .stale-badge {
+        display: inline-block;
+        background: #3a2a00;
+        color: #FFB84D;
+        border: 1px solid #FFB84D;
+        border-radius: 12px;
+        padding: 0.2rem 0.75rem;
+        font-size: 0.85rem;
+        margin-bottom: 0.5rem;
+    }
+    
     .metric-container {
         background: #1E1E1E;
         padding: 1rem;
@@ -169,52 +201,53 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def query_database():
-    """Conectar ao banco MySQL e executar SELECT na tabela confra_pagamentos"""
-    try:
-        conn = pymysql.connect(
-            host=DB_HOST,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            database=DB_DATABASE,
-            port=DB_PORT,
-            cursorclass=pymysql.cursors.DictCursor
-        )
-        
-        with conn.cursor() as cursor:
-            sql = f"SELECT * FROM {DB_DATABASE}.{DB_TABLE};"
-            cursor.execute(sql)
-            resultados = cursor.fetchall()
-            
-            print(f"\n=== CONSULTA BANCO DE DADOS - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} ===")
-            print(f"Total de registros encontrados: {len(resultados)}")
-            
-            for linha in resultados:
-                print(linha)
-            
-            print("=" * 60)
-            
-            return resultados
-            
-    except Exception as e:
-        print(f"Erro ao conectar com o banco de dados: {str(e)}")
-        return []
-    finally:
-        if 'conn' in locals():
-            conn.close()
+def query_database(config):
+    """Totais de pagamento agregados no MySQL (uma linha) da tabela de pagamentos do evento"""
+    # Conexão emprestada do pool compartilhado; duração/linhas vão para o log estruturado
+    return fetch_payment_totals(f"{config['DB_NAME']}.{config['DB_TABLE']}", config['PAYMENT_MONTHS'], config=config)
 
-@st.fragment(run_every=60)
+def get_totals_poller():
+    """Poller compartilhado dos totais (cada chamada mantém o poller ativo)"""
+    # A consulta agregada é tão barata quanto uma sonda; o poller compara o resultado
+    config = DB_CONFIG
+    return get_poller(TOTAIS_SNAPSHOT, lambda: query_database(config), interval=DB_REFRESH_INTERVAL, persist=True)
+
+def get_database_snapshot():
+    """Snapshot compartilhado entre sessões, atualizado por um único thread do processo"""
+    return get_totals_poller().get(timeout=10)
+
+@st.fragment(run_every=CHANGE_WATCH_INTERVAL)
 def database_monitor():
-    """Monitor do banco de dados que executa a cada 1 minuto"""
-    current_time = time.time()
-    if current_time - st.session_state.last_db_update >= 60:
-        st.session_state.database_data = query_database()
-        st.session_state.last_db_update = current_time
+    """Monitor do banco de dados: confere o barramento de mudanças em memória e só
+    reexecuta a página quando o poller publicou uma nova versão do snapshot"""
+    # Tela aberta conta como leitura: o poller não para por inatividade
+    get_totals_poller()
+    seen = change_bus.versions([TOTAIS_SNAPSHOT])
+    if seen == st.session_state.get('db_bus_seen'):
+        return
+    first_run = 'db_bus_seen' not in st.session_state
+    st.session_state.db_bus_seen = seen
+    snapshot = get_database_snapshot()
+    if snapshot is not None and snapshot.version != st.session_state.db_version:
+        st.session_state.database_data = snapshot.data
+        st.session_state.db_version = snapshot.version
+    if not first_run:
+        st.rerun()
+
+def render_stale_badge():
+    """Indica quando o gráfico mostra o último snapshot bom (banco fora ou processo recém-iniciado)"""
+    snapshot = get_database_snapshot()
+    db_status = get_breaker(DB_CONFIG).status()
+    if snapshot is not None and snapshot.data and snapshot.is_stale:
+        circuito = f" · circuito {db_status['state']}" if db_status['state'] != 'fechado' else ""
+        st.markdown(
+            f'<div class="stale-badge">⚠️ Dados desatualizados desde {snapshot.fetched_at.strftime("%H:%M")}{circuito}</div>',
+            unsafe_allow_html=True
+        )
 
 def create_upload_folder():
     """Criar pasta de uploads se não existir"""
-    if not os.path.exists(UPLOAD_FOLDER):
-        os.makedirs(UPLOAD_FOLDER)
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
 def get_countdown():
     """Calcular tempo restante para o churrasco"""
@@ -265,35 +298,43 @@ def cleanup_old_photos():
             except:
                 pass
 
+def render_unavailable():
+    """Estado explícito de dados indisponíveis (banco fora e nenhum snapshot bom em disco)"""
+    snapshot = get_database_snapshot()
+    motivo = f"<br><small>{html.escape(snapshot.error)}</small>" if snapshot is not None and snapshot.error else ""
+    st.markdown(
+        f'<div class="stale-badge">📡 Dados indisponíveis: o banco não respondeu e ainda não há dados salvos.{motivo}</div>',
+        unsafe_allow_html=True
+    )
+
 def create_real_data():
-    """Criar dados reais baseados no banco de dados"""
-    # Se não temos dados do banco, usar dados padrão
+    """Criar dados reais baseados no banco de dados (None se não houver dados reais)"""
+    # Se a sessão ainda não tem dados, lê o snapshot compartilhado
     if not st.session_state.database_data:
-        st.session_state.database_data = query_database()
+        snapshot = get_database_snapshot()
+        if snapshot is not None:
+            st.session_state.database_data = snapshot.data
+            st.session_state.db_version = snapshot.version
     
     data = st.session_state.database_data
     
     if not data:
-        # Fallback para dados de exemplo se banco não estiver disponível
-        return create_sample_data()
-    
-    # Meses do churrasco (agosto a dezembro)
-    meses = ['Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
-    campos_pagamento = ['agosto_pago', 'setembro_pago', 'outubro_pago', 'novembro_pago', 'dezembro_pago']
+        # Banco fora e sem snapshot em disco: nunca exibe valores inventados
+        return None
     
-    total_colaboradores = len(data)
-    valor_esperado_por_mes = total_colaboradores * VALOR_MENSAL_POR_COLABORADOR
+    return summarize_payments(EVENT_ID, st.session_state.db_version, data)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def summarize_payments(event, version, _totals):
+    """Valores mensais (centavos) a partir dos totais agregados; recalculado só quando a versão muda"""
+    totais = _totals
     
-    valores_devidos = []
-    valores_pagos = []
+    # Meses do churrasco, na ordem de PAYMENT_MONTHS
+    campos_pagamento = DB_CONFIG['PAYMENT_MONTHS']
+    meses = [campo.replace('_pago', '').title() for campo in campos_pagamento]
     
-    for campo in campos_pagamento:
-        # Contar quantos colaboradores pagaram este mês
-        pagaram = sum(1 for colaborador in data if colaborador.get(campo, 0) == 1)
-        valor_arrecadado = pagaram * VALOR_MENSAL_POR_COLABORADOR
-        
-        valores_devidos.append(valor_esperado_por_mes)
-        valores_pagos.append(valor_arrecadado)
+    # Quantos colaboradores pagaram cada mês (SUM calculado no banco) × valor mensal
+    valores_devidos, valores_pagos = monthly_values(totais, campos_pagamento, VALOR_MENSAL_POR_COLABORADOR)
     
     df_data = {
         'Mês': meses,
@@ -303,19 +344,6 @@ def create_real_data():
     
     return pd.DataFrame(df_data)
 
-def create_sample_data():
-    """Criar dados de exemplo para o dashboard (fallback)"""
-    months = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho', 
-              'Julho', 'Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
-    
-    data = {
-        'Mês': months,
-        'Valor Devido': [150, 200, 180, 220, 190, 250, 300, 280, 320, 350, 400, 500],
-        'Valor Pago': [120, 180, 150, 200, 170, 230, 250, 260, 280, 300, 350, 450]
-    }
-    
-    return pd.DataFrame(data)
-
 def resize_image(image_path_or_pil, target_width=IMAGE_WIDTH, target_height=IMAGE_HEIGHT):
     """Redimensionar imagem para tamanho padrão mantendo proporção"""
     try:
@@ -382,62 +410,18 @@ def update_dynamic_content():
 @st.fragment(run_every=1)
 def update_right_slideshow():
     """Atualizar slideshow da coluna direita com tamanho estático"""
-    import time, os
-    from PIL import Image
-
-    # ========================
-    # PARÂMETROS DE TAMANHO
-    # ========================
-    TARGET_W = 210   # largura fixa em px
-    TARGET_H = 440   # altura fixa em px
-    FIT_MODE = "contain"  # "contain" (sem cortes) ou "cover" (preenche recortando)
-    BG = (0, 0, 0, 0)     # fundo transparente RGBA
-
-    def fit_to_canvas(img: Image.Image, tw: int, th: int, mode: str = "contain", bg=(0,0,0,0)) -> Image.Image:
-        """Ajusta a imagem para caber em (tw x th) mantendo RGBA e tamanho final fixo."""
-        if img.mode != "RGBA":
-            img = img.convert("RGBA")
-
-        iw, ih = img.size
-        if mode == "cover":
-            scale = max(tw / iw, th / ih)
-        else:  # contain
-            scale = min(tw / iw, th / ih)
-
-        nw = max(1, int(round(iw * scale)))
-        nh = max(1, int(round(ih * scale)))
-        resized = img.resize((nw, nh), Image.LANCZOS)
-
-        if mode == "cover":
-            # recorte central para exatamente tw x th
-            left = max(0, (nw - tw) // 2)
-            top = max(0, (nh - th) // 2)
-            right = min(nw, left + tw)
-            bottom = min(nh, top + th)
-            cropped = resized.crop((left, top, right, bottom))
-            # Se por arredondamento ficou menor, centraliza numa lona
-            if cropped.size != (tw, th):
-                canvas = Image.new("RGBA", (tw, th), bg)
-                cx = (tw - cropped.size[0]) // 2
-                cy = (th - cropped.size[1]) // 2
-                canvas.paste(cropped, (cx, cy), cropped)
-                return canvas
-            return cropped
-        else:
-            # contain: centraliza com bordas/pad transparente
-            canvas = Image.new("RGBA", (tw, th), bg)
-            x = (tw - nw) // 2
-            y = (th - nh) // 2
-            canvas.paste(resized, (x, y), resized)
-            return canvas
+    import time
+
+    # Variantes 210x440 já ajustadas (churrasco_assets); aqui só se lê o arquivo pronto
+    TARGET_W, TARGET_H = VARIANTS['slideshow_silvio_orgulhoso'][1:3]
 
     current_time = time.time()
 
     # Lista das imagens para o slideshow
     right_images = [
-        "images/silvio_orgulhoso.png",
-#        "images/familia_silvio_cleiton.png",
-#        "images/silvinho.png"
+        "slideshow_silvio_orgulhoso",
+#        "slideshow_familia_silvio_cleiton",
+#        "slideshow_silvinho"
     ]
     image_names = ["Silvio Orgulhoso"]
 #    image_names = ["Silvio Orgulhoso", "Família Silvio", "Silvinho"]
@@ -447,22 +431,20 @@ def update_right_slideshow():
         st.session_state.right_image_index = (st.session_state.right_image_index + 1) % len(right_images)
         st.session_state.last_right_image_change = current_time
 
-    current_image_path = right_images[st.session_state.right_image_index]
     current_name = image_names[st.session_state.right_image_index]
 
     try:
+        current_image_path = asset_path(right_images[st.session_state.right_image_index])
+
         # Container com caixa fixa para evitar "salto" no layout
         st.markdown(
             f'<div width:{TARGET_W}px; height:{TARGET_H}px; margin-left:auto; margin-right:auto;">',unsafe_allow_html=True
         )
 
-        if os.path.exists(current_image_path):
-            img = Image.open(current_image_path)
-            fixed = fit_to_canvas(img, TARGET_W, TARGET_H, mode=FIT_MODE, bg=BG)
-
+        if current_image_path:
             # Não usar use_container_width, para respeitar o tamanho fixo
             st.image(
-                fixed,
+                current_image_path,
                 caption=f"{current_name} ({st.session_state.right_image_index + 1}/{len(right_images)})",
                 use_container_width=False,
                 width=TARGET_W  # reforça largura fixa; altura já é TARGET_H na própria imagem
@@ -479,7 +461,7 @@ def update_right_slideshow():
                 ">
                     <p style="color: #FFB84D; margin: 0.25rem 0;">{current_name}</p>
                     <p style="color: #888; margin: 0;">Imagem não encontrada</p>
-                    <p style="color: #666; font-size: 0.8rem; margin: 0;">Verifique: {current_image_path}</p>
+                    <p style="color: #666; font-size: 0.8rem; margin: 0;">Verifique: images/{VARIANTS[right_images[st.session_state.right_image_index]][0]}</p>
                 </div>
                 ''',
                 unsafe_allow_html=True
@@ -503,6 +485,50 @@ def update_right_slideshow():
             unsafe_allow_html=True
         )
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def build_finance_chart(event, version, _df):
+    """Monta o gráfico financeiro para uma versão do snapshot"""
+    df = _df
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        name='Valor Devido',
+        x=df['Mês'],
+        y=to_reais(df['Valor Devido']),
+        marker_color='#FF6B35',
+        text=format_brl_column(df['Valor Devido']),
+        textposition='auto',
+    ))
+    
+    fig.add_trace(go.Bar(
+        name='Valor Pago',
+        x=df['Mês'],
+        y=to_reais(df['Valor Pago']),
+        marker_color='#4CAF50',
+        text=format_brl_column(df['Valor Pago']),
+        textposition='auto',
+    ))
+    
+    fig.update_layout(
+        title='💰 Controle Financeiro Mensal',
+        xaxis_title='Mês',
+        yaxis_title='Valor (R$)',
+        barmode='group',
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color='white'),
+        title_font=dict(size=16, color='#FF6B35'),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    
+    return fig
+
 def get_file_hash(file_content):
     """Gerar hash do arquivo para evitar duplicatas"""
     import hashlib
@@ -601,63 +627,31 @@ def main():
 #        st.markdown('''<div class="sidebar-text">📊 Streamlit é melhor que Power BI! 🚀</div>''', unsafe_allow_html=True)
 
         df = create_real_data()
-        
-        # Gráfico de barras
-        fig = go.Figure()
-        
-        fig.add_trace(go.Bar(
-            name='Valor Devido',
-            x=df['Mês'],
-            y=df['Valor Devido'],
-            marker_color='#FF6B35',
-            text=[f'R$ {v:.2f}' for v in df['Valor Devido']],
-            textposition='auto',
-        ))
-        
-        fig.add_trace(go.Bar(
-            name='Valor Pago',
-            x=df['Mês'],
-            y=df['Valor Pago'],
-            marker_color='#4CAF50',
-            text=[f'R$ {v:.2f}' for v in df['Valor Pago']],
-            textposition='auto',
-        ))
-        
-        fig.update_layout(
-            title='💰 Controle Financeiro Mensal',
-            xaxis_title='Mês',
-            yaxis_title='Valor (R$)',
-            barmode='group',
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color='white'),
-            title_font=dict(size=16, color='#FF6B35'),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            )
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Métricas
-        col_m1, col_m2, col_m3 = st.columns(3)
-        
-        total_devido = df['Valor Devido'].sum()
-        total_pago = df['Valor Pago'].sum()
-        pendente = total_devido - total_pago
-        
-        with col_m1:
-            st.metric("💸 Total Devido", f"R$ {total_devido:,.2f}")
-        
-        with col_m2:
-            st.metric("✅ Total Pago", f"R$ {total_pago:,.2f}")
-        
-        with col_m3:
-            st.metric("⏳ Pendente", f"R$ {pendente:,.2f}")
+        if df is None:
+            render_unavailable()
+        else:
+            render_stale_badge()
+            
+            # Gráfico de barras (reaproveitado enquanto o snapshot não muda)
+            fig = build_finance_chart(EVENT_ID, st.session_state.db_version, df)
+            
+            st.plotly_chart(fig, use_container_width=True)
+            
+            # Métricas
+            col_m1, col_m2, col_m3 = st.columns(3)
+            
+            total_devido = df['Valor Devido'].sum()
+            total_pago = df['Valor Pago'].sum()
+            pendente = total_devido - total_pago
+            
+            with col_m1:
+                st.metric("💸 Total Devido", format_brl(total_devido))
+            
+            with col_m2:
+                st.metric("✅ Total Pago", format_brl(total_pago))
+            
+            with col_m3:
+                st.metric("⏳ Pendente", format_brl(pendente))
     
     # COLUNA DIREITA (30%) - Conteúdo estático
     with col3:
@@ -1,10 +1,7 @@
 import streamlit as st
 import pandas as pd
-import mysql.connector
-from sqlalchemy import create_engine
 import os
 from datetime import datetime, timedelta
-from decimal import Decimal, ROUND_HALF_UP
 import pytz
 from dateutil import parser
 import time
@@ -12,11 +9,21 @@ import tempfile
 import base64
 from PIL import Image
 import io
+import html
+from bisect import bisect_right
+from contextlib import contextmanager, suppress
+from churrasco_db import get_breaker, config_table, read_roster, get_connection, probe_pagamentos, probe_config, fetch_config_rows, has_pessoas_extras_key, run_concurrently, fetch_payment_totals
+from churrasco_snapshot import ConfigTableCache, StaleWhileRevalidate, dataset_versions, save_last_good, load_last_good, get_poller, request_refresh, snapshot_service_url, change_bus
+from churrasco_events import resolve_event, event_overrides, event_key
+from churrasco_roster import RosterIndex
+from churrasco_status import month_label, status_table
+from churrasco_money import format_brl, format_brl_column, paid_cents, payment_amount, payment_financials
+from churrasco_assets import asset_path, asset_url
 
 def image_to_base64(image_path):
     """Converte imagem para base64 para uso no CSS"""
     try:
-        if os.path.exists(image_path):
+        if image_path and os.path.exists(image_path):
             with open(image_path, "rb") as img_file:
                 return base64.b64encode(img_file.read()).decode()
         else:
@@ -26,6 +33,18 @@ def image_to_base64(image_path):
         st.error(f"Erro ao carregar imagem {image_path}: {e}")
         return None
 
+def image_src(name, placeholder):
+    """src de uma variante de imagem: URL em app/static/ (cacheável pelo navegador).
+    
+    Data URI base64 apenas se o static serving estiver desligado.
+    """
+    if st.get_option('server.enableStaticServing'):
+        url = asset_url(name)
+        if url:
+            return url
+    b64 = image_to_base64(asset_path(name))
+    return f"data:image/png;base64,{b64}" if b64 else placeholder
+
 # Configuração da página
 st.set_page_config(
     page_title="Dashboard do Churrasco",
@@ -370,8 +389,8 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Configurações
-def load_config():
-    """Carrega configurações do ambiente"""
+def load_config(event):
+    """Carrega configurações do ambiente, com as sobrescritas do evento"""
     def get_secret_safe(key, default):
         """Obtém secret de forma segura, retornando default se não existir"""
         try:
@@ -390,223 +409,428 @@ def load_config():
         'EVENT_TIME': os.getenv('EVENT_TIME', get_secret_safe('EVENT_TIME', '16:00')),
         'EVENT_TZ': os.getenv('EVENT_TZ', get_secret_safe('EVENT_TZ', 'America/Sao_Paulo')),
         'PAYMENT_MONTHS': os.getenv('PAYMENT_MONTHS', get_secret_safe('PAYMENT_MONTHS', 'agosto_pago,setembro_pago,outubro_pago,novembro_pago,dezembro_pago')).split(','),
-        'DB_READONLY': os.getenv('DB_READONLY', get_secret_safe('DB_READONLY', '1')) == '1'
+        'DB_READONLY': os.getenv('DB_READONLY', get_secret_safe('DB_READONLY', '1')) == '1',
+        'DB_POOL_SIZE': int(os.getenv('DB_POOL_SIZE', get_secret_safe('DB_POOL_SIZE', 5))),
+        'DB_MAX_OVERFLOW': int(os.getenv('DB_MAX_OVERFLOW', get_secret_safe('DB_MAX_OVERFLOW', 10))),
+        'DB_POOL_RECYCLE': int(os.getenv('DB_POOL_RECYCLE', get_secret_safe('DB_POOL_RECYCLE', 1800))),
+        'DB_POOL_PRE_PING': os.getenv('DB_POOL_PRE_PING', get_secret_safe('DB_POOL_PRE_PING', '1')),
+        'CONFIG_TABLE': os.getenv('CONFIG_TABLE', get_secret_safe('CONFIG_TABLE', 'confra_config'))
     }
+    config.update(event_overrides(event))
+    config['EVENT_ID'] = event
     return config
 
-# Valor do pagamento
-PAYMENT_VALUE = Decimal('63.07')
+def scoped(config, name):
+    """Nome de conjunto/poller/snapshot no escopo do evento da configuração"""
+    return event_key(config['EVENT_ID'], name)
 
 # Funções de banco de dados (SOMENTE LEITURA)
-@st.cache_data(ttl=60)
-def read_mysql_data(config):
-    """Lê dados do MySQL (SOMENTE SELECT)"""
+def persist_last_good(name, data):
+    """Grava o último resultado bom em disco (falhas de escrita não afetam a leitura)"""
     try:
-        connection_string = f"mysql+mysqlconnector://{config['DB_USER']}:{config['DB_PASSWORD']}@{config['DB_HOST']}:{config['DB_PORT']}/{config['DB_NAME']}"
-        engine = create_engine(connection_string)
-        
-        # Query SELECT apenas
-        query = f"SELECT colaborador_id, nome_colaborador, {', '.join(config['PAYMENT_MONTHS'])} FROM {config['DB_TABLE']} ORDER BY nome_colaborador"
-        
-        df = pd.read_sql(query, engine)
-        engine.dispose()
-        
-        return df
-    except Exception as e:
-        st.error(f"Erro ao conectar com MySQL: {e}")
-        return pd.DataFrame()
+        save_last_good(name, data, datetime.now())
+    except Exception:
+        pass
+
+def read_last_good(name):
+    """Último resultado bom gravado em disco (None se ausente ou ilegível)"""
+    try:
+        return load_last_good(name)
+    except Exception:
+        return None
+
+def data_cache_topic(event):
+    """Tópico do change_bus publicado quando o cache do evento recebe valores novos"""
+    return f"swr:{event_key(event, 'app_1_dados')}"
+
+@st.cache_resource(max_entries=16)
+def get_data_cache(event):
+    """Cache stale-while-revalidate do evento: reruns nunca esperam o MySQL dentro do limite de defasagem"""
+    return StaleWhileRevalidate(
+        ttl=int(os.getenv('DATA_TTL', 60)),
+        max_staleness=int(os.getenv('DATA_MAX_STALENESS', 600)),
+        topic=data_cache_topic(event)
+    )
+
+def read_service_snapshot(name):
+    """Snapshot publicado pelo serviço local de snapshots (erro se não houver dados)"""
+    snapshot = get_poller(name, None).get(timeout=10)
+    if snapshot is None or snapshot.data is None:
+        raise RuntimeError(snapshot.error if snapshot else "Serviço de snapshots sem resposta")
+    return snapshot
+
+def load_pagamentos(config, previous):
+    """Lê dados do MySQL (SOMENTE SELECT), relendo as linhas apenas quando a sonda indica mudança.
+    
+    O índice da lista (rótulos, lookups e busca por nome) é montado aqui, uma
+    vez por snapshot.
+    """
+    if snapshot_service_url():
+        # Leitor puro: a versão do snapshot do serviço faz o papel da sonda
+        snapshot = read_service_snapshot(scoped(config, 'confra_pagamentos'))
+        token, df = ('servico', snapshot.version), snapshot.data
+        if previous is not None and previous['token'] == token:
+            return previous
+    else:
+        token = probe_pagamentos(config['DB_TABLE'], config['PAYMENT_MONTHS'], config=config)
+        if previous is not None and previous['token'] == token:
+            return previous
+        # Query SELECT apenas das colunas exibidas, com dtypes compactos
+        df = read_roster(config['DB_TABLE'], config['PAYMENT_MONTHS'], config=config)
+    persist_last_good(scoped(config, 'app_1_pagamentos'), df)
+    return {'token': token, 'df': df, 'roster': RosterIndex(df)}
+
+def load_totais(config, previous):
+    """Contagem e soma por mês calculadas no MySQL (uma linha)"""
+    if snapshot_service_url():
+        totais = read_service_snapshot(scoped(config, 'confra_pagamentos_totais')).data
+    else:
+        totais = fetch_payment_totals(config['DB_TABLE'], config['PAYMENT_MONTHS'], config=config)
+    persist_last_good(scoped(config, 'app_1_totais'), totais)
+    return totais
 
 def get_mysql_connection(config):
-    """Cria conexão MySQL"""
-    return mysql.connector.connect(
-        host=config['DB_HOST'],
-        port=config['DB_PORT'],
-        user=config['DB_USER'],
-        password=config['DB_PASSWORD'],
-        database=config['DB_NAME']
+    """Empresta conexão MySQL do pool compartilhado (close() devolve ao pool)"""
+    return get_connection(config)
+
+@st.cache_resource(max_entries=16)
+def get_config_table_cache(config):
+    """Espelho incremental de confra_config compartilhado pelo processo"""
+    return ConfigTableCache(
+        probe=lambda: probe_config(config),
+        fetch_since=lambda since_id, since_updated_at: fetch_config_rows(since_id, since_updated_at, config=config)
     )
 
-def load_config_data(config):
-    """Carrega dados da tabela confra_config"""
-    try:
-        conn = get_mysql_connection(config)
-        cursor = conn.cursor(dictionary=True)
-        
-        # Buscar itens
-        cursor.execute("SELECT * FROM confra_config WHERE config_type = 'item' ORDER BY created_at")
-        itens = cursor.fetchall()
-        
-        # Buscar pessoas extras
-        cursor.execute("SELECT colaborador_id, extra_pessoas FROM confra_config WHERE config_type = 'pessoas_extras'")
-        pessoas_extras_rows = cursor.fetchall()
-        pessoas_extras = {str(row['colaborador_id']): row['extra_pessoas'] for row in pessoas_extras_rows}
-        
-        cursor.close()
-        conn.close()
-        
+@st.cache_resource(max_entries=16, ttl=300, show_spinner=False)
+def pessoas_extras_upsert_ready(config):
+    """Chave única de pessoas extras presente (revalidado a cada 5 min, para pegar a migração)"""
+    return has_pessoas_extras_key(config)
+
+def load_config_rows(config, table_cache):
+    """Linhas de confra_config: do serviço de snapshots ou do espelho local.
+    
+    `table_cache` vem de get_config_table_cache(), obtido na thread do script:
+    os loaders rodam em threads do pool, sem ScriptRunContext.
+    """
+    if table_cache is None:
+        return read_service_snapshot(scoped(config, 'confra_config')).data
+    _, rows = table_cache.load()
+    return rows
+
+def load_itens(config, previous, table_cache=None):
+    """Itens do churrasco a partir do espelho de confra_config, com as chaves de paginação"""
+    rows = load_config_rows(config, table_cache)
+    items = sorted((row for row in rows if row['config_type'] == 'item'), key=item_cursor)
+    return {'items': items, 'keys': [item_cursor(item) for item in items]}
+
+def item_cursor(item):
+    """Chave de ordenação/paginação dos itens: (created_at, id), como no índice (config_type, created_at).
+    
+    created_at nulo vira datetime.min (primeiro, como no ORDER BY do MySQL) para não quebrar a comparação.
+    """
+    return (item['created_at'] or datetime.min, item['id'])
+
+def items_page(items, keys, after, limit):
+    """Paginação por chave (keyset): até `limit` itens depois do cursor `after`.
+    
+    Equivale a WHERE (created_at, id) > cursor ORDER BY created_at, id LIMIT n,
+    mas sobre a lista já ordenada do espelho (busca binária nas chaves
+    pré-calculadas, sem OFFSET); o cursor continua válido quando itens são
+    incluídos ou excluídos.
+    """
+    start = bisect_right(keys, after) if after is not None else 0
+    return start, items[start:start + limit]
+
+def render_items_html(items):
+    """Cards da página inteira em um único bloco HTML (grade CSS de 3 colunas)"""
+    cards = []
+    for item in items:
+        observacoes = (item.get('observacoes') or '').strip()
+        observacoes_html = f'<div class="item-details" style="font-style: italic;">{html.escape(observacoes)}</div>' if observacoes else ''
+        cards.append(
+            f'<div class="item-card"><div class="item-content">'
+            f'<div class="item-title">{html.escape(str(item["item"]))}</div>'
+            f'<div class="item-details">{html.escape(str(item["quantidade"]))} {html.escape(str(item["unidade"] or ""))}</div>'
+            f'<div class="item-collaborator">👤 {html.escape(str(item["nome_colaborador"]))}</div>'
+            f'{observacoes_html}</div></div>'
+        )
+    return f'<div class="item-grid">{"".join(cards)}</div>'
+
+def load_pessoas_extras(config, previous, table_cache=None):
+    """Pessoas extras por colaborador a partir do espelho de confra_config"""
+    rows = load_config_rows(config, table_cache)
+    return {
+        str(row['colaborador_id']): row['extra_pessoas']
+        for row in rows if row['config_type'] == 'pessoas_extras'
+    }
+
+def get_change_pollers(config):
+    """Pollers leves do processo cuja versão muda quando os dados mudam.
+    
+    Com o serviço de snapshots, são os próprios conjuntos publicados por ele;
+    sem o serviço, sondas baratas no MySQL (contagem/checksum e cursor de confra_config).
+    """
+    if snapshot_service_url():
         return {
-            "itens": itens,
-            "pessoas_extras": pessoas_extras
+            'pagamentos': get_poller(scoped(config, 'confra_pagamentos'), None),
+            'config': get_poller(scoped(config, 'confra_config'), None)
         }
-    except Exception as e:
-        st.error(f"Erro ao carregar dados: {e}")
-        return {"itens": [], "pessoas_extras": {}}
+    interval = float(os.getenv('DB_REFRESH_INTERVAL', 5))
+    return {
+        'pagamentos': get_poller(
+            scoped(config, 'app_1_sonda_pagamentos'),
+            lambda: probe_pagamentos(config['DB_TABLE'], config['PAYMENT_MONTHS'], config=config),
+            interval
+        ),
+        'config': get_poller(scoped(config, 'app_1_sonda_config'), lambda: probe_config(config), interval)
+    }
 
-def add_item(colaborador_id, nome_colaborador, item, quantidade, unidade, observacoes, config):
-    """Adiciona item na tabela confra_config"""
+def change_version(poller):
+    snapshot = poller.get(timeout=0)
+    return snapshot.version if snapshot is not None else 0
+
+def load_page_data(config):
+    """Busca pagamentos, totais, itens e pessoas extras em paralelo.
+    
+    Cada conjunto passa pelo cache stale-while-revalidate com a sua versão
+    (escritas locais e pollers de mudança revalidam só o que mudou, em
+    segundo plano).
+    Retorna um snapshot combinado; o tempo de cada leitura vai para o log
+    (run_concurrently) e a latência da página fica limitada pela leitura mais
+    lenta.
+    """
+    cache = get_data_cache(config['EVENT_ID'])
+    changes = get_change_pollers(config)
+    # Recursos de st.cache_resource são obtidos aqui, na thread do script
+    table_cache = None if snapshot_service_url() else get_config_table_cache(config)
+    
+    def cached(name, dataset, source, loader, **extra):
+        # Chave estável por conjunto; versão nova (escrita local ou poller de mudanças)
+        # revalida em segundo plano sem esperar o TTL, servindo o valor anterior
+        version = (dataset_versions.get(scoped(config, dataset)), change_version(changes[source]))
+        return lambda: cache.get(name, lambda previous: loader(config, previous, **extra), version=version)
+    
+    results = run_concurrently({
+        'pagamentos': cached('pagamentos', 'pagamentos', 'pagamentos', load_pagamentos),
+        'totais': cached('totais', 'pagamentos', 'pagamentos', load_totais),
+        'itens': cached('itens', 'itens', 'config', load_itens, table_cache=table_cache),
+        'pessoas_extras': cached('pessoas_extras', 'pessoas_extras', 'config', load_pessoas_extras, table_cache=table_cache)
+    })
+    
+    # Banco fora do ar: usa o último snapshot bom gravado em disco
+    pagamentos = results['pagamentos'].value if results['pagamentos'].error is None else None
+    values = {
+        'pagamentos': pagamentos['df'] if pagamentos is not None else None,
+        'totais': results['totais'].value if results['totais'].error is None else None
+    }
+    tokens = {'pagamentos': pagamentos['token'] if pagamentos is not None else None}
+    stale_since = None
+    for name, fallback in (('pagamentos', pd.DataFrame()), ('totais', None)):
+        if results[name].error is None:
+            continue
+        snapshot = read_last_good(scoped(config, f'app_1_{name}'))
+        if snapshot is not None:
+            values[name] = snapshot.data
+            tokens[name] = ('disco', snapshot.fetched_at)
+            stale_since = min(stale_since or snapshot.fetched_at, snapshot.fetched_at)
+        else:
+            values[name] = fallback
+            st.error(f"Erro ao conectar com MySQL: {results[name].error}")
+    for name in ('itens', 'pessoas_extras'):
+        if results[name].error:
+            st.error(f"Erro ao carregar dados: {results[name].error}")
+    
+    roster = pagamentos['roster'] if pagamentos is not None else RosterIndex(values['pagamentos'])
+    
+    return {
+        'pagamentos': values['pagamentos'],
+        'pagamentos_token': tokens.get('pagamentos'),
+        'roster': roster,
+        'totais': values['totais'],
+        'stale_since': stale_since,
+        'config_data': {
+            'itens': results['itens'].value['items'] if results['itens'].value else [],
+            'itens_keys': results['itens'].value['keys'] if results['itens'].value else [],
+            'pessoas_extras': results['pessoas_extras'].value or {}
+        }
+    }
+
+@contextmanager
+def config_transaction(config, dictionary=True):
+    """Cursor de escrita: commit no sucesso, rollback no erro e a conexão sempre volta ao pool"""
+    conn = get_mysql_connection(config)
     try:
-        conn = get_mysql_connection(config)
-        cursor = conn.cursor()
-        
-        query = """
-        INSERT INTO confra_config (config_type, colaborador_id, nome_colaborador, item, quantidade, unidade, observacoes)
-        VALUES ('item', %s, %s, %s, %s, %s, %s)
-        """
-        cursor.execute(query, (colaborador_id, nome_colaborador, item, quantidade, unidade, observacoes))
-        
-        conn.commit()
-        cursor.close()
+        cursor = conn.cursor(dictionary=dictionary)
+        try:
+            yield cursor
+            conn.commit()
+        except BaseException:
+            # Conexão possivelmente quebrada: o erro original é o que interessa
+            with suppress(Exception):
+                conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    finally:
         conn.close()
+
+def fetch_config_row(cursor, row_id, config):
+    """Relê somente a linha afetada por uma escrita (equivalente a RETURNING)"""
+    cursor.execute(f"SELECT * FROM {config_table(config)} WHERE id = %s", (row_id,))
+    return cursor.fetchone()
+
+def add_item(colaborador_id, nome_colaborador, item, quantidade, unidade, observacoes, config):
+    """Adiciona item na tabela confra_config e retorna a linha gravada"""
+    try:
+        with config_transaction(config) as cursor:
+            query = f"""
+            INSERT INTO {config_table(config)} (config_type, colaborador_id, nome_colaborador, item, quantidade, unidade, observacoes)
+            VALUES ('item', %s, %s, %s, %s, %s, %s)
+            """
+            cursor.execute(query, (colaborador_id, nome_colaborador, item, quantidade, unidade, observacoes))
+            row = fetch_config_row(cursor, cursor.lastrowid, config)
         
-        # Clear cache to refresh data
-        st.cache_data.clear()
+        # Write-through: aplica a linha no espelho e invalida apenas o cache de itens
+        get_config_table_cache(config).apply(rows=[row])
+        dataset_versions.bump(scoped(config, 'itens'))
+        request_refresh(scoped(config, 'confra_config'))
+        return row
         
     except Exception as e:
         st.error(f"Erro ao adicionar item: {e}")
+        return None
 
 def update_item(item_id, colaborador_id, nome_colaborador, item, quantidade, unidade, observacoes, config):
-    """Atualiza item na tabela confra_config"""
+    """Atualiza item na tabela confra_config e retorna a linha gravada"""
     try:
-        conn = get_mysql_connection(config)
-        cursor = conn.cursor()
-        
-        query = """
-        UPDATE confra_config 
-        SET colaborador_id = %s, nome_colaborador = %s, item = %s, quantidade = %s, unidade = %s, observacoes = %s
-        WHERE id = %s AND config_type = 'item'
-        """
-        cursor.execute(query, (colaborador_id, nome_colaborador, item, quantidade, unidade, observacoes, item_id))
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
+        with config_transaction(config) as cursor:
+            query = f"""
+            UPDATE {config_table(config)} 
+            SET colaborador_id = %s, nome_colaborador = %s, item = %s, quantidade = %s, unidade = %s, observacoes = %s
+            WHERE id = %s AND config_type = 'item'
+            """
+            cursor.execute(query, (colaborador_id, nome_colaborador, item, quantidade, unidade, observacoes, item_id))
+            row = fetch_config_row(cursor, item_id, config)
         
-        # Clear cache to refresh data
-        st.cache_data.clear()
+        # Write-through: aplica a linha no espelho e invalida apenas o cache de itens
+        if row:
+            get_config_table_cache(config).apply(rows=[row])
+        else:
+            get_config_table_cache(config).apply(deleted_ids=[item_id])
+        dataset_versions.bump(scoped(config, 'itens'))
+        request_refresh(scoped(config, 'confra_config'))
+        return row
         
     except Exception as e:
         st.error(f"Erro ao atualizar item: {e}")
+        return None
 
 def delete_item(item_id, config):
-    """Remove item da tabela confra_config"""
+    """Remove item da tabela confra_config; retorna True em caso de sucesso"""
     try:
-        conn = get_mysql_connection(config)
-        cursor = conn.cursor()
+        with config_transaction(config, dictionary=False) as cursor:
+            cursor.execute(f"DELETE FROM {config_table(config)} WHERE id = %s AND config_type = 'item'", (item_id,))
         
-        cursor.execute("DELETE FROM confra_config WHERE id = %s AND config_type = 'item'", (item_id,))
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
-        
-        # Clear cache to refresh data
-        st.cache_data.clear()
+        # Write-through: remove a linha do espelho e invalida apenas o cache de itens
+        get_config_table_cache(config).apply(deleted_ids=[item_id])
+        dataset_versions.bump(scoped(config, 'itens'))
+        request_refresh(scoped(config, 'confra_config'))
+        return True
         
     except Exception as e:
         st.error(f"Erro ao excluir item: {e}")
+        return False
+
+def set_pessoas_extras(changes, config):
+    """Aplica em lote as pessoas extras alteradas na tabela confra_config.
 
-def set_pessoas_extras(mapping_por_id, config):
-    """Define pessoas extras na tabela confra_config"""
+    `changes` mapeia colaborador_id -> (nome_colaborador, extra_pessoas) e deve
+    conter apenas as linhas alteradas; valor 0 remove o registro. Tudo roda em
+    uma transação: um INSERT ... ON DUPLICATE KEY UPDATE multi-linha
+    (executemany, pela chave única uq_config_type_colaborador), o DELETE em
+    lote dos zerados e a releitura das linhas gravadas. Sem a chave única
+    (migração 003 pendente) grava com UPDATE dos existentes + INSERT dos novos.
+    """
+    if not changes:
+        return True
+    
     try:
-        conn = get_mysql_connection(config)
-        cursor = conn.cursor()
-        
-        # Busca os nomes dos colaboradores para incluir na inserção
-        df_mysql = read_mysql_data(config)
-        colaborador_names = {str(row['colaborador_id']): row['nome_colaborador'] for _, row in df_mysql.iterrows()}
-        
-        # Busca registros existentes de pessoas_extras
-        cursor.execute("SELECT colaborador_id, extra_pessoas FROM confra_config WHERE config_type = 'pessoas_extras'")
-        existing_records = {str(row[0]): row[1] for row in cursor.fetchall()}
-        
-        # Processa cada colaborador
-        for colaborador_id, extra_pessoas in mapping_por_id.items():
-            colaborador_id_str = str(colaborador_id)
-            nome_colaborador = colaborador_names.get(colaborador_id_str, "")
+        upsert_ready = pessoas_extras_upsert_ready(config)
+        with config_transaction(config) as cursor:
+            upserts = [
+                (int(cid), nome, int(extra))
+                for cid, (nome, extra) in changes.items() if int(extra) > 0
+            ]
+            removed_ids = [int(cid) for cid, (_, extra) in changes.items() if int(extra) <= 0]
+            
+            deleted_row_ids = []
+            if removed_ids:
+                remove_placeholders = ', '.join(['%s'] * len(removed_ids))
+                # Ids das linhas removidas (para o write-through)
+                cursor.execute(
+                    f"SELECT id FROM {config_table(config)} WHERE config_type = 'pessoas_extras' AND colaborador_id IN ({remove_placeholders})",
+                    tuple(removed_ids)
+                )
+                deleted_row_ids = [row['id'] for row in cursor.fetchall()]
+                if deleted_row_ids:
+                    cursor.execute(
+                        f"DELETE FROM {config_table(config)} WHERE config_type = 'pessoas_extras' AND colaborador_id IN ({remove_placeholders})",
+                        tuple(removed_ids)
+                    )
             
-            if extra_pessoas > 0:
-                if colaborador_id_str in existing_records:
-                    # Atualiza apenas se o valor mudou
-                    if existing_records[colaborador_id_str] != extra_pessoas:
-                        query = """
-                        UPDATE confra_config 
-                        SET extra_pessoas = %s, nome_colaborador = %s, updated_at = CURRENT_TIMESTAMP
-                        WHERE config_type = 'pessoas_extras' AND colaborador_id = %s
-                        """
-                        cursor.execute(query, (extra_pessoas, nome_colaborador, colaborador_id))
+            changed_rows = []
+            if upserts:
+                upsert_placeholders = ', '.join(['%s'] * len(upserts))
+                insert_sql = (
+                    f"INSERT INTO {config_table(config)} (config_type, colaborador_id, nome_colaborador, extra_pessoas) "
+                    "VALUES ('pessoas_extras', %s, %s, %s)"
+                )
+                if upsert_ready:
+                    cursor.executemany(
+                        insert_sql + " ON DUPLICATE KEY UPDATE nome_colaborador = VALUES(nome_colaborador), extra_pessoas = VALUES(extra_pessoas)",
+                        upserts
+                    )
                 else:
-                    # Insere novo registro
-                    query = """
-                    INSERT INTO confra_config (config_type, colaborador_id, nome_colaborador, extra_pessoas)
-                    VALUES ('pessoas_extras', %s, %s, %s)
-                    """
-                    cursor.execute(query, (colaborador_id, nome_colaborador, extra_pessoas))
-            else:
-                # Remove registro se extra_pessoas = 0 e existe no banco
-                if colaborador_id_str in existing_records:
-                    cursor.execute("DELETE FROM confra_config WHERE config_type = 'pessoas_extras' AND colaborador_id = %s", (colaborador_id,))
-        
-        # Remove registros que não estão mais no mapping_por_id
-        for existing_id in existing_records.keys():
-            if existing_id not in [str(cid) for cid in mapping_por_id.keys()]:
-                cursor.execute("DELETE FROM confra_config WHERE config_type = 'pessoas_extras' AND colaborador_id = %s", (existing_id,))
-        
-        conn.commit()
-        cursor.close()
-        conn.close()
+                    # Sem a chave única o upsert duplicaria linhas: atualiza quem já existe, insere o resto
+                    cursor.execute(
+                        f"SELECT colaborador_id FROM {config_table(config)} WHERE config_type = 'pessoas_extras' AND colaborador_id IN ({upsert_placeholders})",
+                        tuple(row[0] for row in upserts)
+                    )
+                    existing = {int(row['colaborador_id']) for row in cursor.fetchall()}
+                    updates = [(nome, extra, cid) for cid, nome, extra in upserts if cid in existing]
+                    inserts = [row for row in upserts if row[0] not in existing]
+                    if updates:
+                        cursor.executemany(
+                            f"UPDATE {config_table(config)} SET nome_colaborador = %s, extra_pessoas = %s "
+                            "WHERE config_type = 'pessoas_extras' AND colaborador_id = %s",
+                            updates
+                        )
+                    if inserts:
+                        cursor.executemany(insert_sql, inserts)
+                cursor.execute(
+                    f"SELECT * FROM {config_table(config)} WHERE config_type = 'pessoas_extras' AND colaborador_id IN ({upsert_placeholders})",
+                    tuple(row[0] for row in upserts)
+                )
+                changed_rows = cursor.fetchall()
         
-        # Clear cache to refresh data
-        st.cache_data.clear()
+        # Write-through: aplica no espelho e invalida apenas o cache de pessoas extras
+        get_config_table_cache(config).apply(rows=changed_rows, deleted_ids=deleted_row_ids)
+        dataset_versions.bump(scoped(config, 'pessoas_extras'))
+        request_refresh(scoped(config, 'confra_config'))
+        return True
         
     except Exception as e:
         st.error(f"Erro ao salvar pessoas extras: {e}")
+        return False
 
 # Funções de cálculo
-def format_currency(value):
-    """Formata valor em reais"""
-    if isinstance(value, Decimal):
-        value = value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
-    return f"R$ {value:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
-
-def calculate_financials(df, meses_pagamento):
-    """Calcula dados financeiros"""
-    if df.empty:
-        return {
-            'total_devido': Decimal('0'),
-            'total_arrecadado': Decimal('0'),
-            'percentual_pago': 0,
-            'colaboradores_count': 0
-        }
-    
-    colaboradores_count = len(df)
-    total_evento = PAYMENT_VALUE * len(meses_pagamento) * colaboradores_count
-    
-    # Soma pagamentos realizados
-    pagamentos_realizados = 0
-    for mes in meses_pagamento:
-        if mes in df.columns:
-            pagamentos_realizados += df[mes].sum()
-    
-    total_arrecadado = PAYMENT_VALUE * pagamentos_realizados
-    total_devido = total_evento - total_arrecadado
-    percentual_pago = (pagamentos_realizados / (len(meses_pagamento) * colaboradores_count) * 100) if colaboradores_count > 0 else 0
-    
-    return {
-        'total_devido': total_devido,
-        'total_arrecadado': total_arrecadado,
-        'percentual_pago': percentual_pago,
-        'colaboradores_count': colaboradores_count
-    }
+# Rótulos (pago, vencido, a vencer); a cor vai no emoji, sem Styler
+STATUS_LABELS = ("🟢 Orgulho do Silvio", "🔴 Qual a dificuldade?", "🟠 Tá no orçamento?")
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def build_status_table(event, token, current_month, _df, months):
+    """Status de todos os colaboradores × meses para um snapshot (token) e mês atual"""
+    return status_table(_df, list(months), STATUS_LABELS, current_month, columns={'nome_colaborador': 'nome_colaborador'})
 
 def get_countdown(event_datetime):
     """Calcula contagem regressiva"""
@@ -625,10 +849,13 @@ if 'editing' not in st.session_state:
     st.session_state.editing = False
 if 'last_refresh' not in st.session_state:
     st.session_state.last_refresh = time.time()
-if 'edit_item_index' not in st.session_state:
-    st.session_state.edit_item_index = None
-if 'delete_item_index' not in st.session_state:
-    st.session_state.delete_item_index = None
+if 'edit_item_id' not in st.session_state:
+    st.session_state.edit_item_id = None
+if 'delete_item_id' not in st.session_state:
+    st.session_state.delete_item_id = None
+if 'itens_cursors' not in st.session_state:
+    # Pilha de cursores (created_at, id) do início de cada página visitada
+    st.session_state.itens_cursors = [None]
 if 'show_edit_modal' not in st.session_state:
     st.session_state.show_edit_modal = False
 if 'show_delete_modal' not in st.session_state:
@@ -637,19 +864,37 @@ if 'show_add_modal' not in st.session_state:
     st.session_state.show_add_modal = False
 
 # Carrega configurações
-config = load_config()
-config_data = load_config_data(config)
-
-current_time = time.time()
-should_refresh = (
-    not st.session_state.editing and 
-    (current_time - st.session_state.last_refresh) >= 60
-)
+# Evento exibido (?evento=<id>); caches, versões e pollers ficam no escopo dele
+config = load_config(resolve_event(st.query_params.get('evento')))
+PAYMENT_AMOUNT = payment_amount(config)
+
+# Pagamentos e confra_config são lidos em paralelo
+page_data = load_page_data(config)
+config_data = page_data['config_data']
+df_mysql = page_data['pagamentos']
+roster = page_data['roster']
+
+st.session_state.last_refresh = time.time()
+
+@st.fragment(run_every=float(os.getenv('CHANGE_WATCH_INTERVAL', 2)))
+def watch_data_changes():
+    """Reexecuta a página só quando um conjunto exibido mudou.
+    
+    Confere apenas versões em memória (barramento de mudanças do processo); a
+    sessão fica parada enquanto nada muda ou enquanto o usuário edita.
+    """
+    topics = [poller.name for poller in get_change_pollers(config).values()]
+    topics += [f"dataset:{scoped(config, 'itens')}", f"dataset:{scoped(config, 'pessoas_extras')}"]
+    # Valores revalidados em segundo plano ficam prontos depois do aviso de mudança
+    topics.append(data_cache_topic(config['EVENT_ID']))
+    seen = change_bus.versions(topics)
+    if 'change_bus_seen' not in st.session_state:
+        st.session_state.change_bus_seen = seen
+    elif seen != st.session_state.change_bus_seen and not st.session_state.editing:
+        st.session_state.change_bus_seen = seen
+        st.rerun()
 
-if should_refresh:
-    st.session_state.last_refresh = current_time
-    st.cache_data.clear()
-    st.rerun()
+watch_data_changes()
 
 # Header Hero - usa configurações do .env
 try:
@@ -661,49 +906,43 @@ except:
     countdown = "Data inválida"
     event_display = f"{config['EVENT_DATE']} às {config['EVENT_TIME']}"
 
-# Convertendo imagens do cabeçalho para base64
-header_images_b64 = {}
-header_image_paths = {
-    'silvinho': 'images/silvinha.png',
-    'familia': 'images/david.png'
+# Imagens do cabeçalho por URL (variantes 150px em static/; o HTML leva só o endereço)
+HEADER_PLACEHOLDER = "data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iODAiIGhlaWdodD0iODAiIHZpZXdCb3g9IjAgMCA4MCA4MCIgZmlsbD0ibm9uZSIgeG1sbnM9Imh0dHA6Ly93d3cudzMub3JnLzIwMDAvc3ZnIj4KPGNpcmNsZSBjeD0iNDAiIGN5PSI0MCIgcj0iNDAiIGZpbGw9IiNGRkQ3MDAiLz4KPHN2ZyB3aWR0aD0iNDAiIGhlaWdodD0iNDAiIHg9IjIwIiB5PSIyMCIgdmlld0JveD0iMCAwIDI0IDI0IiBmaWxsPSJub25lIiBzdHJva2U9IiMwMDAiIHN0cm9rZS13aWR0aD0iMiI+CjxjaXJjbGUgY3g9IjEyIiBjeT0iMTIiIHI9IjMiLz4KPC9zdmc+Cjwvc3ZnPg=="
+header_images = {
+    'silvinho': image_src('header_silvinha', HEADER_PLACEHOLDER),
+    'familia': image_src('header_david', HEADER_PLACEHOLDER)
 }
 
-for key, path in header_image_paths.items():
-    b64 = image_to_base64(path)
-    if b64:
-        header_images_b64[key] = f"data:image/png;base64,{b64}"
-    else:
-        # Placeholder se não encontrar a imagem
-        header_images_b64[key] = "data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iODAiIGhlaWdodD0iODAiIHZpZXdCb3g9IjAgMCA4MCA4MCIgZmlsbD0ibm9uZSIgeG1sbnM9Imh0dHA6Ly93d3cudzMub3JnLzIwMDAvc3ZnIj4KPGNpcmNsZSBjeD0iNDAiIGN5PSI0MCIgcj0iNDAiIGZpbGw9IiNGRkQ3MDAiLz4KPHN2ZyB3aWR0aD0iNDAiIGhlaWdodD0iNDAiIHg9IjIwIiB5PSIyMCIgdmlld0JveD0iMCAwIDI0IDI0IiBmaWxsPSJub25lIiBzdHJva2U9IiMwMDAiIHN0cm9rZS13aWR0aD0iMiI+CjxjaXJjbGUgY3g9IjEyIiBjeT0iMTIiIHI9IjMiLz4KPC9zdmc+Cjwvc3ZnPg=="
-
 st.markdown(f"""
 <div class="hero-header">
     <div style="display: flex; align-items: center; justify-content: space-between; position: relative;">
-        <img src="{header_images_b64.get('silvinho', '')}" alt="Silvio Santos" style="width: 150px; height: 150px; object-fit: contain; border-radius: 8px;">
+        <img src="{header_images.get('silvinho', '')}" alt="Silvio Santos" style="width: 150px; height: 150px; object-fit: contain; border-radius: 8px;">
         <div style="flex: 1; text-align: center;">
             <div class="hero-title">Streamlit é melhor que Power BI</div>
             <div class="hero-subtitle">{event_display}</div>
         </div>
-        <img src="{header_images_b64.get('familia', '')}" alt="Família Silvio Santos" style="width: 150px; height: 150px; object-fit: contain; border-radius: 8px;">
+        <img src="{header_images.get('familia', '')}" alt="Família Silvio Santos" style="width: 150px; height: 150px; object-fit: contain; border-radius: 8px;">
     </div>
     <div class="countdown" style="margin-top: 1rem;">{countdown}</div>
 </div>
 """, unsafe_allow_html=True)
 
-# Carrega dados do MySQL
-df_mysql = read_mysql_data(config)
-
 # Calcula financeiros
-financials = calculate_financials(df_mysql, config['PAYMENT_MONTHS'])
+financials = payment_financials(page_data['totais'], config['PAYMENT_MONTHS'], PAYMENT_AMOUNT)
 
 # KPIs
 st.markdown("### Indicadores")
+db_status = get_breaker(config).status()
+if page_data['stale_since']:
+    st.warning(f"⚠️ MySQL indisponível (circuito {db_status['state']}) — exibindo os últimos dados reais, desatualizados desde {page_data['stale_since'].strftime('%H:%M')}")
+elif db_status['state'] != 'fechado':
+    st.caption(f"🛡️ Circuito do banco {db_status['state']}: exibindo dados em cache")
 kpi_cols = st.columns(6)
 
 with kpi_cols[0]:
     st.markdown(f"""
     <div class="kpi-card">
-        <div class="kpi-value">{format_currency(financials['total_devido'])}</div>
+        <div class="kpi-value">{format_brl(financials['total_devido'])}</div>
         <div class="kpi-label">Total Devido</div>
     </div>
     """, unsafe_allow_html=True)
@@ -711,7 +950,7 @@ with kpi_cols[0]:
 with kpi_cols[1]:
     st.markdown(f"""
     <div class="kpi-card">
-        <div class="kpi-value">{format_currency(financials['total_arrecadado'])}</div>
+        <div class="kpi-value">{format_brl(financials['total_arrecadado'])}</div>
         <div class="kpi-label">Arrecadado ({financials['percentual_pago']:.1f}%)</div>
     </div>
     """, unsafe_allow_html=True)
@@ -751,20 +990,10 @@ with kpi_cols[5]:
     </div>
     """, unsafe_allow_html=True)
 
-silvio_images_b64 = {}
-image_paths = {
-    'silvio1': 'images/silvio_orgulhoso_face.png',
-    'silvio2': 'images/silvio_orgulhoso_face.png', 
-    'silvio3': 'images/silvio_orgulhoso_face.png'
-}
-
-for key, path in image_paths.items():
-    b64 = image_to_base64(path)
-    if b64:
-        silvio_images_b64[key] = f"data:image/png;base64,{b64}"
-    else:
-        # Placeholder se não encontrar a imagem
-        silvio_images_b64[key] = "data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iNTAiIGhlaWdodD0iNTAiIHZpZXdCb3g9IjAgMCA1MCA1MCIgZmlsbD0ibm9uZSIgeG1zbnM9Imh0dHA6Ly93d3cudzMub3JnLzIwMDAvc3ZnIj4KPGNpcmNsZSBjeD0iMjUiIGN5PSIyNSIgcj0iMjUiIGZpbGw9IiNGRkQ3MDAiLz4KPHN2ZyB3aWR0aD0iMzAiIGhlaWdodD0iMzAiIHg9IjEwIiB5PSIxMCIgdmlld0JveD0iMCAwIDI0IDI0IiBmaWxsPSJub25lIiBzdHJva2U9IiMwMDAiIHN0cm9rZS13aWR0aD0iMiI+CjxjaXJjbGUgY3g9IjEyIiBjeT0iMTIiIHI9IjMiLz4KPHBhdGggZD0ibTMgMTIgMS41LTEuNUw5IDEybC0xLjUgMS41TDMgMTJabTYuNS0zLjVMMTEgN2w0IDQtMS41IDEuNUw5IDguNVptNy41IDcuNUwxNyAxN2wtNCA0IDEuNSAxLjVMMTggMTZabS03LjUgMy41TDEzIDE3bC00LTQgMS41LTEuNUwxNSAxNS41WiIvPgo8L3N2Zz4KPC9zdmc+"
+# Rosto do indicador de progresso por URL (uma variante de 100px, cacheada pelo navegador)
+SILVIO_PLACEHOLDER = "data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iNTAiIGhlaWdodD0iNTAiIHZpZXdCb3g9IjAgMCA1MCA1MCIgZmlsbD0ibm9uZSIgeG1zbnM9Imh0dHA6Ly93d3cudzMub3JnLzIwMDAvc3ZnIj4KPGNpcmNsZSBjeD0iMjUiIGN5PSIyNSIgcj0iMjUiIGZpbGw9IiNGRkQ3MDAiLz4KPHN2ZyB3aWR0aD0iMzAiIGhlaWdodD0iMzAiIHg9IjEwIiB5PSIxMCIgdmlld0JveD0iMCAwIDI0IDI0IiBmaWxsPSJub25lIiBzdHJva2U9IiMwMDAiIHN0cm9rZS13aWR0aD0iMiI+CjxjaXJjbGUgY3g9IjEyIiBjeT0iMTIiIHI9IjMiLz4KPHBhdGggZD0ibTMgMTIgMS41LTEuNUw5IDEybC0xLjUgMS41TDMgMTJabTYuNS0zLjVMMTEgN2w0IDQtMS41IDEuNUw5IDguNVptNy41IDcuNUwxNyAxN2wtNCA0IDEuNSAxLjVMMTggMTZabS03LjUgMy41TDEzIDE3bC00LTQgMS41LTEuNUwxNSAxNS41WiIvPgo8L3N2Zz4KPC9zdmc+"
+silvio_image = image_src('progress_silvio', SILVIO_PLACEHOLDER)
+silvio_images = {'silvio1': silvio_image, 'silvio2': silvio_image, 'silvio3': silvio_image}
 
 # Barra de progresso
 st.markdown("### Progresso dos Pagamentos")
@@ -773,11 +1002,11 @@ progress_value = financials['percentual_pago'] / 100
 percentual = financials['percentual_pago']
 
 if percentual <= 40:
-    silvio_image_url = silvio_images_b64.get('silvio1', '')
+    silvio_image_url = silvio_images.get('silvio1', '')
 elif percentual <= 70:
-    silvio_image_url = silvio_images_b64.get('silvio2', '')
+    silvio_image_url = silvio_images.get('silvio2', '')
 else:
-    silvio_image_url = silvio_images_b64.get('silvio3', '')
+    silvio_image_url = silvio_images.get('silvio3', '')
 
 st.markdown(f"""
 <div class="custom-progress-container">
@@ -808,90 +1037,36 @@ if not df_mysql.empty:
     with col2:
         status_filter = st.selectbox("Filtrar por status", ["Todos", "Com pagamento", "Sem pagamento"])
     
-    # Aplica filtros
-    df_display = df_mysql.copy()
-    
-    if nome_filter:
-        df_display = df_display[df_display['nome_colaborador'].str.contains(nome_filter, case=False, na=False)]
-    
-    # Determina o mês atual
-    mes_atual = datetime.now().month
-    meses_nomes = {
-        8: 'agosto_pago',
-        9: 'setembro_pago', 
-        10: 'outubro_pago',
-        11: 'novembro_pago',
-        12: 'dezembro_pago'
-    }
-    
-    def get_status_message(valor, mes_nome):
-        """Retorna mensagem baseada no valor e período do mês"""
-        if valor == 1:
-            return "Orgulho do Silvio"
-        
-        # Extrai o número do mês do nome
-        mes_num = None
-        for num, nome in meses_nomes.items():
-            if nome == mes_nome:
-                mes_num = num
-                break
-        
-        if mes_num is None:
-            return "Qual a dificuldade?"
-        
-        # Se é mês passado ou atual
-        if mes_num <= mes_atual:
-            return "Qual a dificuldade?"
-        else:
-            return "Tá no orçamento?"
-    
-    for mes in config['PAYMENT_MONTHS']:
-        if mes in df_display.columns:
-            df_display[mes] = df_display[mes].apply(
-                lambda x, mes_nome=mes: get_status_message(x, mes_nome)
-            )
+    # Status do roster inteiro: uma passada vetorizada por snapshot e mês atual
+    meses_tabela = [mes for mes in config['PAYMENT_MONTHS'] if mes in df_mysql.columns]
+    status_df = build_status_table(
+        config['EVENT_ID'], page_data['pagamentos_token'], datetime.now().month, df_mysql, tuple(meses_tabela)
+    )
     
-    # Calcula coluna "Pago (R$)"
-    df_display['Pago (R$)'] = 0
-    for mes in config['PAYMENT_MONTHS']:
-        if mes in df_mysql.columns:  # usa df_mysql original para cálculo numérico
-            df_display['Pago (R$)'] += df_mysql[mes] * float(PAYMENT_VALUE)
+    # Aplica filtros (nome: índice sem acentos do snapshot, tolera erros de digitação)
+    positions = roster.name_index.search(nome_filter) if nome_filter else range(len(df_mysql))
+    df_display = status_df.take(positions)
+    pago = paid_cents(df_mysql, meses_tabela, PAYMENT_AMOUNT).take(positions)
     
     if status_filter == "Com pagamento":
-        df_display = df_display[df_display['Pago (R$)'] > 0]
+        df_display, pago = df_display[pago > 0], pago[pago > 0]
     elif status_filter == "Sem pagamento":
-        df_display = df_display[df_display['Pago (R$)'] == 0]
-    
-    # Formata valores monetários
-    df_display['Pago (R$)'] = df_display['Pago (R$)'].apply(lambda x: format_currency(Decimal(str(x))))
+        df_display, pago = df_display[pago == 0], pago[pago == 0]
     
-    # Renomeia colunas para exibição
-    display_columns = ['nome_colaborador'] + [mes for mes in config['PAYMENT_MONTHS'] if mes in df_display.columns] + ['Pago (R$)']
-    df_display = df_display[display_columns]
+    # Coluna "Pago (R$)": centavos inteiros, formatados de uma vez
+    df_display['Pago (R$)'] = format_brl_column(pago)
     
     column_config = {
         'nome_colaborador': st.column_config.TextColumn('Nome do Colaborador', width='medium'),
         'Pago (R$)': st.column_config.TextColumn('Pago (R$)', width='small')
     }
-    
-    for mes in config['PAYMENT_MONTHS']:
-        if mes in df_display.columns:
-            mes_display = mes.replace('_pago', '').title()
-            column_config[mes] = st.column_config.TextColumn(mes_display, width='small')
-    
-    def color_status(val):
-        """Aplica cores aos status de pagamento"""
-        if val == "Orgulho do Silvio":
-            return 'color: #10b981; font-weight: 600'
-        elif val == "Qual a dificuldade?":
-            return 'color: #ef4444; font-weight: 600'
-        elif val == "Tá no orçamento?":
-            return 'color: #f97316; font-weight: 600'
-        return ''
+    for mes in meses_tabela:
+        column_config[mes] = st.column_config.TextColumn(month_label(mes), width='small')
     
     st.dataframe(
-        df_display.style.map(color_status, subset=[mes for mes in config['PAYMENT_MONTHS'] if mes in df_display.columns]),
+        df_display,
         column_config=column_config,
+        column_order=['nome_colaborador'] + meses_tabela + ['Pago (R$)'],
         hide_index=True,
         use_container_width=True
     )
@@ -924,12 +1099,9 @@ if st.session_state.get('show_add_modal', False):
             col1, col2 = st.columns(2)
             
             with col1:
-                if not df_mysql.empty:
-                    colaborador_options = {f"{row['nome_colaborador']} (ID: {row['colaborador_id']})": row['colaborador_id'] 
-                                         for _, row in df_mysql.iterrows()}
-                    selected_colaborador = st.selectbox("Colaborador", options=list(colaborador_options.keys()))
-                    colaborador_id = colaborador_options[selected_colaborador]
-                    nome_colaborador = selected_colaborador.split(' (ID:')[0]
+                if len(roster):
+                    selected_colaborador = st.selectbox("Colaborador", options=roster.options)
+                    colaborador_id, nome_colaborador = roster.select(selected_colaborador)
                 else:
                     st.warning("Nenhum colaborador encontrado")
                     colaborador_id = None
@@ -949,12 +1121,11 @@ if st.session_state.get('show_add_modal', False):
                 
                 if submitted and colaborador_id:
                     if item.strip():
-                        add_item(colaborador_id, nome_colaborador, item.strip(), quantidade, unidade.strip(), observacoes.strip(), config)
-                        st.success(f"✅ Item '{item}' cadastrado para {nome_colaborador}!")
-                        st.session_state.show_add_modal = False
-                        st.session_state.editing = False
-                        time.sleep(1)
-                        st.rerun()
+                        if add_item(colaborador_id, nome_colaborador, item.strip(), quantidade, unidade.strip(), observacoes.strip(), config):
+                            st.toast(f"✅ Item '{item}' cadastrado para {nome_colaborador}!")
+                            st.session_state.show_add_modal = False
+                            st.session_state.editing = False
+                            st.rerun()
                     else:
                         st.error("❌ Por favor, informe o item")
             
@@ -965,8 +1136,10 @@ if st.session_state.get('show_add_modal', False):
                     st.rerun()
 
 # Modal de edição de item
-if st.session_state.get('show_edit_modal', False) and st.session_state.edit_item_index is not None:
-    item_to_edit = config_data['itens'][st.session_state.edit_item_index]
+itens_by_id = {item['id']: item for item in config_data.get('itens', [])}
+
+if st.session_state.get('show_edit_modal', False) and st.session_state.edit_item_id in itens_by_id:
+    item_to_edit = itens_by_id[st.session_state.edit_item_id]
     
     st.markdown("### Editar Item")
     
@@ -974,22 +1147,12 @@ if st.session_state.get('show_edit_modal', False) and st.session_state.edit_item
         col1, col2 = st.columns(2)
         
         with col1:
-            if not df_mysql.empty:
-                colaborador_options = {f"{row['nome_colaborador']} (ID: {row['colaborador_id']})": row['colaborador_id'] 
-                                     for _, row in df_mysql.iterrows()}
-                
-                # Encontrar o colaborador atual
-                current_colaborador = None
-                for key, value in colaborador_options.items():
-                    if value == item_to_edit['colaborador_id']:
-                        current_colaborador = key
-                        break
-                
+            if len(roster):
+                # Colaborador atual pré-selecionado (posição direto do índice)
                 selected_colaborador = st.selectbox("Colaborador", 
-                                                   options=list(colaborador_options.keys()),
-                                                   index=list(colaborador_options.keys()).index(current_colaborador) if current_colaborador else 0)
-                colaborador_id = colaborador_options[selected_colaborador]
-                nome_colaborador = selected_colaborador.split(' (ID:')[0]
+                                                   options=roster.options,
+                                                   index=roster.position(item_to_edit['colaborador_id']))
+                colaborador_id, nome_colaborador = roster.select(selected_colaborador)
             else:
                 st.warning("Nenhum colaborador encontrado")
                 colaborador_id = item_to_edit['colaborador_id']
@@ -1008,7 +1171,7 @@ if st.session_state.get('show_edit_modal', False) and st.session_state.edit_item
             if st.form_submit_button("Salvar Alterações", type="primary"):
                 if item.strip():
                     # Atualizar item
-                    update_item(
+                    updated = update_item(
                         item_to_edit['id'],
                         colaborador_id, 
                         nome_colaborador, 
@@ -1018,25 +1181,25 @@ if st.session_state.get('show_edit_modal', False) and st.session_state.edit_item
                         observacoes.strip(), 
                         config
                     )
-                    st.success(f"✅ Item '{item}' atualizado!")
-                    st.session_state.show_edit_modal = False
-                    st.session_state.edit_item_index = None
-                    st.session_state.editing = False
-                    time.sleep(1)
-                    st.rerun()
+                    if updated:
+                        st.toast(f"✅ Item '{item}' atualizado!")
+                        st.session_state.show_edit_modal = False
+                        st.session_state.edit_item_id = None
+                        st.session_state.editing = False
+                        st.rerun()
                 else:
                     st.error("❌ Por favor, informe o item")
         
         with col2:
             if st.form_submit_button("Cancelar"):
                 st.session_state.show_edit_modal = False
-                st.session_state.edit_item_index = None
+                st.session_state.edit_item_id = None
                 st.session_state.editing = False
                 st.rerun()
 
 # Modal de confirmação de exclusão de item
-if st.session_state.get('show_delete_modal', False) and st.session_state.delete_item_index is not None:
-    item_to_delete = config_data['itens'][st.session_state.delete_item_index]
+if st.session_state.get('show_delete_modal', False) and st.session_state.delete_item_id in itens_by_id:
+    item_to_delete = itens_by_id[st.session_state.delete_item_id]
     
     st.markdown("### Confirmar Exclusão")
     st.warning(f"Tem certeza que deseja excluir o item **{item_to_delete['item']}** de **{item_to_delete['nome_colaborador']}**?")
@@ -1045,18 +1208,17 @@ if st.session_state.get('show_delete_modal', False) and st.session_state.delete_
     with col1:
         if st.button("🗑️ Sim, Excluir", type="primary", use_container_width=True):
             # Remover item
-            delete_item(item_to_delete['id'], config)
-            st.success(f"✅ Item '{item_to_delete['item']}' excluído!")
-            st.session_state.show_delete_modal = False
-            st.session_state.delete_item_index = None
-            st.session_state.editing = False
-            time.sleep(1)
-            st.rerun()
+            if delete_item(item_to_delete['id'], config):
+                st.toast(f"✅ Item '{item_to_delete['item']}' excluído!")
+                st.session_state.show_delete_modal = False
+                st.session_state.delete_item_id = None
+                st.session_state.editing = False
+                st.rerun()
     
     with col2:
         if st.button("❌ Cancelar", use_container_width=True):
             st.session_state.show_delete_modal = False
-            st.session_state.delete_item_index = None
+            st.session_state.delete_item_id = None
             st.session_state.editing = False
             st.rerun()
 
@@ -1102,85 +1264,108 @@ if config_data.get('itens'):
         font-size: 12px;
         margin-bottom: 15px;
     }
-    .item-buttons {
-        display: flex;
-        gap: 10px;
-        justify-content: flex-end;
-    }
     /* Adicionando container para conteúdo flexível */
     .item-content {
         flex-grow: 1;
         display: flex;
         flex-direction: column;
     }
+    .item-grid {
+        display: grid;
+        grid-template-columns: repeat(3, minmax(0, 1fr));
+        gap: 0 16px;
+    }
     </style>
     """, unsafe_allow_html=True)
     
-    # Organizando itens em grid de 3 colunas
-    items_per_row = 3
-    items = config_data['itens']
+    # Página atual (paginação por chave); widgets e HTML não crescem com o total de itens
+    items, keys = config_data['itens'], config_data['itens_keys']
+    page_size = int(os.getenv('ITEMS_PAGE_SIZE', 24))
+    cursors = st.session_state.itens_cursors
+    start, page = items_page(items, keys, cursors[-1], page_size)
+    if not page and len(cursors) > 1:
+        # Página esvaziada por exclusões: volta para a anterior
+        cursors.pop()
+        start, page = items_page(items, keys, cursors[-1], page_size)
+    
+    st.markdown(render_items_html(page), unsafe_allow_html=True)
+    
+    # Navegação entre páginas
+    col_prev, col_info, col_next = st.columns([1, 4, 1])
+    with col_prev:
+        if st.button("◀ Anteriores", key="itens_prev", disabled=len(cursors) <= 1, use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with col_info:
+        st.caption(f"Itens {start + 1}–{start + len(page)} de {len(items)}")
+    with col_next:
+        if st.button("Próximos ▶", key="itens_next", disabled=start + len(page) >= len(items), use_container_width=True):
+            cursors.append(item_cursor(page[-1]))
+            st.rerun()
     
-    for i in range(0, len(items), items_per_row):
-        cols = st.columns(items_per_row)
-        
-        for j, col in enumerate(cols):
-            item_index = i + j
-            if item_index < len(items):
-                item = items[item_index]
-                
-                with col:
-                    observacoes_html = ""
-                    if item.get("observacoes") and item["observacoes"].strip():
-                        observacoes_html = f'<div class="item-details" style="font-style: italic;">{item["observacoes"]}</div>'
-                    
-                    st.markdown(f"""
-                    <div class="item-card">
-                        <div class="item-content">
-                            <div class="item-title">{item['item']}</div>
-                            <div class="item-details">{item['quantidade']} {item['unidade']}</div>
-                            <div class="item-collaborator">👤 {item['nome_colaborador']}</div>
-                            {observacoes_html}
-                    <!--    </div> -->
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    # Botões fora do card HTML mas dentro da coluna
-                    col_edit, col_delete = st.columns(2)
-                    
-                    with col_edit:
-                        if st.button("✏️ Editar", key=f"edit_{item_index}", help="Editar item", use_container_width=True):
-                            st.session_state.edit_item_index = item_index
-                            st.session_state.show_edit_modal = True
-                            st.session_state.editing = True
-                            st.rerun()
-                    
-                    with col_delete:
-                        if st.button("🗑️ Excluir", key=f"delete_{item_index}", help="Excluir item", use_container_width=True):
-                            st.session_state.delete_item_index = item_index
-                            st.session_state.show_delete_modal = True
-                            st.session_state.editing = True
-                            st.rerun()
+    # Um único seletor de ações para os itens da página
+    col_select, col_edit, col_delete = st.columns([4, 1, 1])
+    with col_select:
+        selected_item_id = st.selectbox(
+            "Item",
+            options=[item['id'] for item in page],
+            format_func=lambda item_id: f"{itens_by_id[item_id]['item']} — {itens_by_id[item_id]['nome_colaborador']}",
+            key="item_action_select",
+            label_visibility="collapsed"
+        )
+    with col_edit:
+        if st.button("✏️ Editar", key="edit_item_btn", help="Editar item", use_container_width=True):
+            st.session_state.edit_item_id = selected_item_id
+            st.session_state.show_edit_modal = True
+            st.session_state.editing = True
+            st.rerun()
+    with col_delete:
+        if st.button("🗑️ Excluir", key="delete_item_btn", help="Excluir item", use_container_width=True):
+            st.session_state.delete_item_id = selected_item_id
+            st.session_state.show_delete_modal = True
+            st.session_state.editing = True
+            st.rerun()
 
 with st.expander("👥 Pessoas Extras por Colaborador", expanded=False):
     if not df_mysql.empty:
         with st.form("form_pessoas_extras"):
             pessoas_extras = config_data.get('pessoas_extras', {})
             
-            extras_data = {}
-            for _, row in df_mysql.iterrows():
-                colaborador_id = str(row['colaborador_id'])
-                nome = row['nome_colaborador']
-                current_value = pessoas_extras.get(colaborador_id, 0)
-                
-                extras_data[colaborador_id] = st.number_input(
-                    f"👤 {nome}",
-                    min_value=0,
-                    value=current_value,
-                    key=f"extras_{colaborador_id}"
-                )
+            # Uma única grade editável no lugar de um number_input por colaborador
+            extras_df = pd.DataFrame({
+                'colaborador_id': roster.ids,
+                'nome_colaborador': [roster.names[cid] for cid in roster.ids],
+                'extra_pessoas': [int(pessoas_extras.get(str(cid), 0)) for cid in roster.ids]
+            })
+            
+            edited_df = st.data_editor(
+                extras_df,
+                column_config={
+                    'colaborador_id': None,
+                    'nome_colaborador': st.column_config.TextColumn('👤 Colaborador', disabled=True),
+                    'extra_pessoas': st.column_config.NumberColumn('Pessoas extras', min_value=0, step=1, required=True)
+                },
+                hide_index=True,
+                use_container_width=True,
+                key="extras_editor"
+            )
             
             if st.form_submit_button("Salvar Pessoas Extras", type="primary"):
-                set_pessoas_extras(extras_data, config)
+                # Envia apenas as linhas alteradas
+                changed = edited_df[edited_df['extra_pessoas'] != extras_df['extra_pessoas']]
+                changes = {
+                    cid: (nome, extra)
+                    for cid, nome, extra in zip(changed['colaborador_id'], changed['nome_colaborador'], changed['extra_pessoas'])
+                }
+                
+                # Remove também registros de colaboradores que saíram da lista
+                for cid in pessoas_extras.keys():
+                    if int(cid) not in roster:
+                        changes[int(cid)] = ("", 0)
+                
+                if set_pessoas_extras(changes, config):
+                    st.toast("✅ Pessoas extras salvas!")
+                    st.rerun()
 
 # JavaScript para preservar posição de rolagem
 st.markdown("""
@@ -0,0 +1,147 @@
+"""Variantes pré-dimensionadas das imagens fixas dos apps.
+
+Cada variante (avatar do cabeçalho, tela do slideshow, rosto da barra de
+progresso) é gerada uma única vez a partir da imagem original e gravada em
+ASSET_CACHE_DIR com o hash do conteúdo da origem (e dos parâmetros) no nome
+do arquivo: trocar a imagem original gera outra variante, e arquivos já
+gerados nunca são refeitos. Em tempo de execução os apps só leem esses
+arquivos pequenos.
+
+Por padrão o cache fica em static/assets, servido pelo próprio Streamlit
+(server.enableStaticServing em .streamlit/config.toml): asset_url() devolve a
+URL da variante com ?v=<hash>, o que faz o servidor (StaticFileHandler do
+Tornado) responder com cache de longa duração; como o nome muda junto com o
+conteúdo, o navegador nunca exibe uma versão velha.
+
+Para gerar tudo antes do deploy:
+    python churrasco_assets.py
+"""
+import hashlib
+import logging
+import os
+import threading
+
+from PIL import Image
+
+logger = logging.getLogger('churrasco.assets')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Pasta servida pelo Streamlit em app/static/ (ao lado do script principal)
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+STATIC_URL = 'app/static'
+# Caminho relativo é resolvido a partir desta pasta (não do diretório de trabalho)
+ASSET_CACHE_DIR = os.path.join(BASE_DIR, os.getenv('ASSET_CACHE_DIR', os.path.join(STATIC_DIR, 'assets')))
+IMAGES_DIR = os.path.join(BASE_DIR, 'images')
+# Muda quando o processamento muda (invalida variantes já geradas)
+PIPELINE_VERSION = 1
+
+# nome -> (imagem original, largura, altura, modo); "contain" centraliza sem
+# cortes em fundo transparente, "cover" preenche recortando o centro
+VARIANTS = {
+    'header_silvinha': ('silvinha.png', 150, 150, 'contain'),
+    'header_david': ('david.png', 150, 150, 'contain'),
+    'progress_silvio': ('silvio_orgulhoso_face.png', 100, 100, 'contain'),
+    'slideshow_silvio_orgulhoso': ('silvio_orgulhoso.png', 210, 440, 'contain'),
+    'slideshow_familia_silvio_cleiton': ('familia_silvio_cleiton.png', 210, 440, 'contain'),
+    'slideshow_silvinho': ('silvinho.png', 210, 440, 'contain'),
+}
+
+_paths = {}
+_lock = threading.Lock()
+
+
+def fit_to_canvas(img, tw, th, mode='contain', bg=(0, 0, 0, 0)):
+    """Ajusta a imagem para exatamente (tw x th), mantendo RGBA"""
+    if img.mode != 'RGBA':
+        img = img.convert('RGBA')
+
+    iw, ih = img.size
+    scale = max(tw / iw, th / ih) if mode == 'cover' else min(tw / iw, th / ih)
+    nw = max(1, int(round(iw * scale)))
+    nh = max(1, int(round(ih * scale)))
+    resized = img.resize((nw, nh), Image.LANCZOS)
+
+    if mode == 'cover':
+        # Recorte central; se por arredondamento ficar menor, centraliza na lona
+        left = max(0, (nw - tw) // 2)
+        top = max(0, (nh - th) // 2)
+        resized = resized.crop((left, top, min(nw, left + tw), min(nh, top + th)))
+        nw, nh = resized.size
+        if (nw, nh) == (tw, th):
+            return resized
+
+    canvas = Image.new('RGBA', (tw, th), bg)
+    canvas.paste(resized, ((tw - nw) // 2, (th - nh) // 2), resized)
+    return canvas
+
+
+def _variant_key(source_path, width, height, mode):
+    """Hash do conteúdo da origem + parâmetros da variante"""
+    digest = hashlib.sha256()
+    with open(source_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    digest.update(f"{width}x{height}:{mode}:v{PIPELINE_VERSION}".encode())
+    return digest.hexdigest()[:16]
+
+
+def build_variant(name):
+    """Gera (se ainda não existir) a variante e retorna o caminho no cache"""
+    source, width, height, mode = VARIANTS[name]
+    source_path = os.path.join(IMAGES_DIR, source)
+    path = os.path.join(ASSET_CACHE_DIR, f"{name}-{_variant_key(source_path, width, height, mode)}.png")
+    if os.path.exists(path):
+        return path
+
+    os.makedirs(ASSET_CACHE_DIR, exist_ok=True)
+    with Image.open(source_path) as img:
+        variant = fit_to_canvas(img, width, height, mode)
+    # Grava em arquivo temporário e renomeia: leitores nunca veem arquivo pela metade
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    variant.save(tmp_path, 'PNG', optimize=True)
+    os.replace(tmp_path, path)
+    logger.info("Variante %s gerada: %s (%d bytes)", name, path, os.path.getsize(path))
+    return path
+
+
+def asset_path(name):
+    """Caminho da variante pronta (None se a imagem original não existir).
+
+    O caminho fica em memória por processo, indexado pelo mtime/tamanho da
+    origem: reruns não releem nem recalculam o hash.
+    """
+    source_path = os.path.join(IMAGES_DIR, VARIANTS[name][0])
+    try:
+        stat = os.stat(source_path)
+    except OSError:
+        return None
+    key = (name, stat.st_mtime_ns, stat.st_size)
+    path = _paths.get(key)
+    if path is None or not os.path.exists(path):
+        with _lock:
+            path = build_variant(name)
+            _paths[key] = path
+    return path
+
+
+def asset_url(name):
+    """URL relativa da variante servida em app/static/ (None fora de static/ ou sem origem)"""
+    path = asset_path(name)
+    if path is None:
+        return None
+    relative = os.path.relpath(os.path.abspath(path), STATIC_DIR)
+    if relative.startswith(os.pardir):
+        return None
+    content_hash = os.path.splitext(os.path.basename(path))[0].rsplit('-', 1)[-1]
+    return f"{STATIC_URL}/{relative.replace(os.sep, '/')}?v={content_hash}"
+
+
+def build_all():
+    """Gera todas as variantes cujas imagens originais existem"""
+    return {name: asset_path(name) for name in VARIANTS}
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    for name, path in build_all().items():
+        print(f"{name:<36} {path or 'imagem original não encontrada'}")
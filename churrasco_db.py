@@ -0,0 +1,680 @@
+"""Acesso compartilhado ao MySQL usado pelos três dashboards do churrasco.
+
+Cada processo mantém um único engine SQLAlchemy com pool de conexões, criado
+na primeira utilização e reaproveitado por todas as leituras e escritas.
+
+Todo acesso passa por timeouts de conexão/consulta, novas tentativas com
+backoff para falhas transitórias e um circuit breaker por destino de conexão
+(host:porta/banco): após falhas seguidas aquele banco deixa de ser consultado
+durante um período de espera e os chamadores servem os dados em cache; eventos
+em outros bancos não são afetados.
+
+Cada consulta gera um registro estruturado (JSON) no logger `churrasco.db`,
+com duração, linhas, bytes e chamador; registros de sucesso são amostrados e o
+dump das linhas só acontece com DB_LOG_ROWS=1.
+
+Pagamentos podem estar em dois layouts (PAYMENTS_LAYOUT): `wide`, uma coluna
+por mês em confra_pagamentos, ou `long`, uma linha por (colaborador_id,
+period) em confra_pagamentos_periodos. As leituras devolvem o mesmo formato
+nos dois casos (um flag por coluna de PAYMENT_MONTHS).
+"""
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import pandas as pd
+from sqlalchemy import create_engine, event, text
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import URL
+
+# Nomes como string Arrow quando pyarrow estiver disponível; senão, categoria
+try:
+    import pyarrow  # noqa: F401
+    NAME_DTYPE = 'string[pyarrow]'
+except ImportError:
+    NAME_DTYPE = 'category'
+
+logger = logging.getLogger('churrasco.db')
+
+
+_logging_configured = False
+
+
+def configure_logging():
+    """Handler único para os loggers `churrasco.*` (nível em DB_LOG_LEVEL).
+
+    Chamada no primeiro acesso ao banco, não no import: os apps carregam o
+    .env depois de importar este módulo.
+    """
+    global _logging_configured
+    root = logging.getLogger('churrasco')
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
+        root.addHandler(handler)
+        root.propagate = False
+    root.setLevel(os.getenv('DB_LOG_LEVEL', 'INFO').upper())
+    _logging_configured = True
+
+# Engines por destino (host/porta/usuário/banco), um por processo
+_engines = {}
+_engines_lock = threading.Lock()
+
+# Pool de threads para consultas independentes executadas em paralelo
+_executor = None
+_executor_lock = threading.Lock()
+
+# Erros que indicam banco indisponível/lento (e não SQL inválido)
+TRANSIENT_ERRORS = (sa_exc.OperationalError, sa_exc.InterfaceError, sa_exc.TimeoutError)
+
+
+class CircuitOpenError(RuntimeError):
+    """Levantado quando o circuit breaker está aberto e o banco não é consultado"""
+
+
+class CircuitBreaker:
+    """Circuit breaker do acesso ao MySQL.
+
+    Fechado: tudo passa. Após `threshold` falhas transitórias seguidas abre e
+    rejeita chamadas por `cooldown` segundos; depois disso fica meio-aberto e
+    deixa passar uma única chamada de teste, que fecha ou reabre o circuito.
+
+    Sem valores explícitos, threshold/cooldown vêm de DB_BREAKER_THRESHOLD e
+    DB_BREAKER_COOLDOWN, lidos a cada uso (o .env é carregado após o import).
+    """
+
+    def __init__(self, threshold=None, cooldown=None):
+        self._threshold = threshold
+        self._cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def threshold(self):
+        return self._threshold if self._threshold is not None else int(os.getenv('DB_BREAKER_THRESHOLD', 3))
+
+    @property
+    def cooldown(self):
+        return self._cooldown if self._cooldown is not None else float(os.getenv('DB_BREAKER_COOLDOWN', 30))
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'fechado'
+        if time.monotonic() - self.opened_at < self.cooldown:
+            return 'aberto'
+        return 'meio-aberto'
+
+    def before_call(self):
+        """Libera a chamada ou levanta CircuitOpenError; True se ela for a chamada de teste"""
+        with self._lock:
+            state = self.state
+            if state == 'fechado':
+                return False
+            if state == 'meio-aberto' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+        raise CircuitOpenError(f"Banco indisponível (circuit breaker aberto): {self.last_error}")
+
+    def end_trial(self):
+        """Libera a vaga da chamada de teste, mesmo se ela foi interrompida"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self, error):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)
+            if self._trial_in_flight or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def status(self):
+        """Estado visível do breaker (para exibir nos dashboards)"""
+        retry_in = None
+        if self.opened_at is not None:
+            retry_in = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'last_error': self.last_error,
+            'retry_in': retry_in,
+        }
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_target(config=None):
+    """Destino protegido por um breaker (host:porta/banco): eventos no mesmo banco o compartilham"""
+    config = config or load_db_config()
+    return f"{config['DB_HOST']}:{config['DB_PORT']}/{config['DB_NAME']}"
+
+
+def get_breaker(config=None):
+    """Circuit breaker do banco da configuração (um por destino de conexão)"""
+    target = breaker_target(config)
+    breaker = _breakers.get(target)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(target, CircuitBreaker())
+    return breaker
+
+
+def breaker_statuses():
+    """Estado de todos os breakers já usados no processo, por destino"""
+    return {target: breaker.status() for target, breaker in list(_breakers.items())}
+
+
+def load_db_config():
+    """Carrega as configurações de banco e de pool a partir do ambiente"""
+    return {
+        'DB_HOST': os.getenv('DB_HOST', 'localhost'),
+        'DB_PORT': int(os.getenv('DB_PORT', 3306)),
+        'DB_USER': os.getenv('DB_USER', 'root'),
+        'DB_PASSWORD': os.getenv('DB_PASSWORD', ''),
+        'DB_NAME': os.getenv('DB_NAME', os.getenv('DB_DATABASE', 'churrasco')),
+        'DB_TABLE': os.getenv('DB_TABLE', 'confra_pagamentos'),
+        'CONFIG_TABLE': os.getenv('CONFIG_TABLE', 'confra_config'),
+        'PAYMENT_MONTHS': os.getenv('PAYMENT_MONTHS', 'agosto_pago,setembro_pago,outubro_pago,novembro_pago,dezembro_pago').split(','),
+        'PAYMENTS_LAYOUT': os.getenv('PAYMENTS_LAYOUT', 'wide'),
+        'PAYMENTS_TABLE': os.getenv('PAYMENTS_TABLE', 'confra_pagamentos_periodos'),
+        'PAYMENT_YEAR': int(os.getenv('PAYMENT_YEAR', 2025)),
+    }
+
+
+def _pool_settings(config):
+    """Parâmetros do pool: valores do config têm prioridade sobre o ambiente"""
+    def pick(key, default):
+        return config.get(key, os.getenv(key, default))
+
+    return {
+        'pool_size': int(pick('DB_POOL_SIZE', 5)),
+        'max_overflow': int(pick('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(pick('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': int(pick('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': str(pick('DB_POOL_PRE_PING', '1')) == '1',
+    }
+
+
+def _timeout_settings(config):
+    """Timeouts de conexão e de consulta (s); config tem prioridade sobre o ambiente"""
+    return (
+        int(config.get('DB_CONNECT_TIMEOUT', os.getenv('DB_CONNECT_TIMEOUT', 5))),
+        int(config.get('DB_READ_TIMEOUT', os.getenv('DB_READ_TIMEOUT', 15))),
+    )
+
+
+def _connect_args(driver, connect_timeout, read_timeout):
+    if driver == 'pymysql':
+        return {'connect_timeout': connect_timeout, 'read_timeout': read_timeout, 'write_timeout': read_timeout}
+    # mysql-connector: timeout do socket (conexão e leituras)
+    return {'connection_timeout': max(connect_timeout, read_timeout)}
+
+
+def _engine_url(config):
+    return URL.create(
+        f"mysql+{config.get('DB_DRIVER', os.getenv('DB_DRIVER', 'mysqlconnector'))}",
+        username=config['DB_USER'],
+        password=config['DB_PASSWORD'],
+        host=config['DB_HOST'],
+        port=int(config['DB_PORT']),
+        database=config['DB_NAME'],
+    )
+
+
+def get_engine(config=None):
+    """Retorna o engine compartilhado do processo, criando-o na primeira chamada"""
+    if not _logging_configured:
+        configure_logging()
+    config = config or load_db_config()
+    url = _engine_url(config)
+    key = url.render_as_string(hide_password=False)
+
+    engine = _engines.get(key)
+    if engine is not None:
+        return engine
+
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            connect_timeout, read_timeout = _timeout_settings(config)
+            engine = create_engine(
+                url,
+                connect_args=_connect_args(url.get_driver_name(), connect_timeout, read_timeout),
+                **_pool_settings(config),
+            )
+
+            @event.listens_for(engine, 'connect')
+            def _limit_statement_time(dbapi_conn, _record):
+                # Limite do lado do servidor para SELECTs (MySQL >= 5.7.8)
+                cursor = dbapi_conn.cursor()
+                try:
+                    cursor.execute(f"SET SESSION MAX_EXECUTION_TIME = {read_timeout * 1000}")
+                except Exception:
+                    pass
+                finally:
+                    cursor.close()
+
+            _engines[key] = engine
+        return engine
+
+
+def guarded(fn, retries=None, backoff=None, config=None):
+    """Executa fn() protegido pelo circuit breaker do banco, com novas tentativas e backoff exponencial"""
+    retries = int(os.getenv('DB_RETRIES', 2)) if retries is None else retries
+    backoff = float(os.getenv('DB_RETRY_BACKOFF', 0.2)) if backoff is None else backoff
+    breaker = get_breaker(config)
+
+    attempt = 0
+    while True:
+        trial = breaker.before_call()
+        try:
+            result = fn()
+        except TRANSIENT_ERRORS as e:
+            breaker.record_failure(e)
+            if attempt >= retries or breaker.state != 'fechado':
+                raise
+            time.sleep(backoff * (2 ** attempt))
+            attempt += 1
+            continue
+        except Exception:
+            # SQL inválido e afins: o banco respondeu, então o circuito fica fechado
+            breaker.record_success()
+            raise
+        finally:
+            # KeyboardInterrupt, StopException do Streamlit etc. não prendem o meio-aberto
+            if trial:
+                breaker.end_trial()
+        breaker.record_success()
+        return result
+
+
+def get_connection(config=None):
+    """Empresta uma conexão DBAPI do pool; close() devolve ao pool"""
+    # Escritas não são repetidas automaticamente: só a obtenção da conexão é protegida
+    return guarded(lambda: get_engine(config).raw_connection(), retries=0, config=config)
+
+
+def _caller():
+    """Primeira função fora deste módulo na pilha (módulo:função)"""
+    frame = sys._getframe(1)
+    while frame is not None and frame.f_globals.get('__name__') == __name__:
+        frame = frame.f_back
+    if frame is None:
+        return None
+    return f"{frame.f_globals.get('__name__')}:{frame.f_code.co_name}"
+
+
+def _result_size(result):
+    """(linhas, bytes aproximados) de uma lista de dicts ou DataFrame"""
+    if isinstance(result, pd.DataFrame):
+        return len(result), int(result.memory_usage(index=False, deep=True).sum())
+    return len(result), sum(len(str(value)) for row in result for value in row.values())
+
+
+def _log_query(sql, caller, started, result=None, error=None, config=None):
+    """Emite um registro estruturado por consulta, com amostragem dos sucessos"""
+    duration_ms = (time.perf_counter() - started) * 1000
+    if error is not None:
+        level = logging.ERROR
+    elif duration_ms >= float(os.getenv('DB_SLOW_QUERY_MS', 1000)):
+        level = logging.WARNING
+    else:
+        level = logging.INFO
+        if random.random() >= float(os.getenv('DB_LOG_SAMPLE_RATE', 0.1)):
+            return
+    if not logger.isEnabledFor(level):
+        return
+
+    record = {
+        'event': 'query',
+        'caller': caller,
+        'sql': ' '.join(sql.split())[:200],
+        'duration_ms': round(duration_ms, 1),
+        'breaker': get_breaker(config).state,
+    }
+    if error is not None:
+        record['error'] = f"{type(error).__name__}: {error}"
+    else:
+        record['rows'], record['bytes'] = _result_size(result)
+    logger.log(level, json.dumps(record, default=str))
+
+    if result is not None and os.getenv('DB_LOG_ROWS') == '1' and logger.isEnabledFor(logging.DEBUG):
+        rows = result.to_dict('records') if isinstance(result, pd.DataFrame) else result
+        for row in rows:
+            logger.debug(json.dumps({'event': 'row', 'caller': caller, 'row': row}, default=str))
+
+
+def _logged(sql, run, config=None):
+    caller = _caller()
+    started = time.perf_counter()
+    try:
+        result = guarded(run, config=config)
+    except Exception as e:
+        _log_query(sql, caller, started, error=e, config=config)
+        raise
+    _log_query(sql, caller, started, result=result, config=config)
+    return result
+
+
+def fetch_all(sql, params=None, config=None):
+    """Executa um SELECT e retorna as linhas como lista de dicts"""
+    def run():
+        with get_engine(config).connect() as conn:
+            result = conn.execute(text(sql), params or {})
+            return [dict(row) for row in result.mappings()]
+    return _logged(sql, run, config=config)
+
+
+def read_dataframe(sql, params=None, config=None):
+    """Executa um SELECT e retorna um DataFrame"""
+    def run():
+        with get_engine(config).connect() as conn:
+            return pd.read_sql(text(sql), conn, params=params)
+    return _logged(sql, run, config=config)
+
+
+MONTH_NUMBERS = {
+    'janeiro': 1, 'fevereiro': 2, 'marco': 3, 'abril': 4, 'maio': 5, 'junho': 6,
+    'julho': 7, 'agosto': 8, 'setembro': 9, 'outubro': 10, 'novembro': 11, 'dezembro': 12,
+}
+
+
+def _payments_settings(config):
+    """(layout, tabela de períodos, ano) dos pagamentos; config tem prioridade sobre o ambiente"""
+    config = config or load_db_config()
+    return (
+        config.get('PAYMENTS_LAYOUT', os.getenv('PAYMENTS_LAYOUT', 'wide')),
+        config.get('PAYMENTS_TABLE', os.getenv('PAYMENTS_TABLE', 'confra_pagamentos_periodos')),
+        int(config.get('PAYMENT_YEAR', os.getenv('PAYMENT_YEAR', 2025))),
+    )
+
+
+def payment_periods(months, year, overrides=None):
+    """Mapeia cada coluna de mês ('agosto_pago') para o período 'AAAA-MM'.
+
+    PAYMENT_PERIODS (ex.: 'agosto_pago=2025-08,janeiro_pago=2026-01') permite
+    colunas de outro ano ou nomes fora do padrão <mes>_pago.
+    """
+    if overrides is None:
+        overrides = os.getenv('PAYMENT_PERIODS', '')
+    explicit = dict(item.split('=', 1) for item in overrides.split(',') if '=' in item)
+    periods = {}
+    for mes in months:
+        if mes in explicit:
+            periods[mes] = explicit[mes].strip()
+        else:
+            periods[mes] = f"{year}-{MONTH_NUMBERS[mes.split('_')[0]]:02d}"
+    return periods
+
+
+def periods_table(table, config=None):
+    """Tabela de períodos no mesmo banco (prefixo) da tabela de colaboradores"""
+    _, name, _ = _payments_settings(config)
+    schema = table.rsplit('.', 1)[0] + '.' if '.' in table else ''
+    return f"{schema}{name}"
+
+
+def _period_params(months, config):
+    _, _, year = _payments_settings(config)
+    return {f"period_{i}": period for i, period in enumerate(payment_periods(months, year).values())}
+
+
+def roster_sql(table, months, order_by='nome_colaborador', layout='wide', payments_table=None):
+    """SELECT apenas das colunas exibidas: id, nome e um flag por mês.
+
+    No layout long os flags são montados a partir da tabela de períodos
+    (um LEFT JOIN agrupado por colaborador, parâmetros :period_<i>).
+    """
+    if layout == 'long':
+        flags = ', '.join(
+            f"COALESCE(MAX(p.period = :period_{i}), 0) AS {mes}" for i, mes in enumerate(months)
+        )
+        sql = (
+            f"SELECT c.colaborador_id, c.nome_colaborador, {flags} FROM {table} c "
+            f"LEFT JOIN {payments_table} p ON p.colaborador_id = c.colaborador_id "
+            f"GROUP BY c.colaborador_id, c.nome_colaborador"
+        )
+    else:
+        sql = f"SELECT colaborador_id, nome_colaborador, {', '.join(months)} FROM {table}"
+    if order_by:
+        sql += f" ORDER BY {order_by}"
+    return sql
+
+
+def compact_roster(df, months):
+    """Converte o DataFrame de colaboradores para dtypes compactos (in-place)"""
+    if df.empty:
+        return df
+    df['colaborador_id'] = pd.to_numeric(df['colaborador_id'], downcast='integer')
+    df['nome_colaborador'] = df['nome_colaborador'].astype(NAME_DTYPE)
+    for mes in months:
+        if mes in df.columns:
+            df[mes] = df[mes].fillna(0).astype('int8')
+    return df
+
+
+def read_roster(table, months, config=None, order_by='nome_colaborador'):
+    """Lê a lista de colaboradores com projeção de colunas e dtypes compactos"""
+    layout, _, _ = _payments_settings(config)
+    if layout == 'long':
+        sql = roster_sql(table, months, order_by, layout, periods_table(table, config))
+        return compact_roster(read_dataframe(sql, _period_params(months, config), config=config), months)
+    return compact_roster(read_dataframe(roster_sql(table, months, order_by), config=config), months)
+
+
+@dataclass(frozen=True)
+class QueryResult:
+    """Resultado de uma consulta executada em paralelo, com o tempo gasto"""
+    value: Any
+    seconds: float
+    error: Optional[Exception] = None
+
+
+def get_query_executor():
+    """Pool de threads compartilhado do processo para consultas paralelas"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv('DB_QUERY_WORKERS', 4)),
+                    thread_name_prefix='db-query',
+                )
+    return _executor
+
+
+def _log_concurrent(caller, results):
+    """Registro estruturado do tempo de cada consulta de um run_concurrently"""
+    slowest_ms = max((result.seconds for result in results.values()), default=0) * 1000
+    if any(result.error is not None for result in results.values()):
+        level = logging.ERROR
+    elif slowest_ms >= float(os.getenv('DB_SLOW_QUERY_MS', 1000)):
+        level = logging.WARNING
+    else:
+        level = logging.INFO
+        if random.random() >= float(os.getenv('DB_LOG_SAMPLE_RATE', 0.1)):
+            return
+    if not logger.isEnabledFor(level):
+        return
+    logger.log(level, json.dumps({
+        'event': 'concurrent',
+        'caller': caller,
+        'duration_ms': round(slowest_ms, 1),
+        'timings_ms': {name: round(result.seconds * 1000, 1) for name, result in results.items()},
+        'errors': {name: f"{type(result.error).__name__}: {result.error}" for name, result in results.items() if result.error is not None},
+    }, default=str))
+
+
+def run_concurrently(tasks):
+    """Executa consultas independentes em paralelo.
+
+    `tasks` mapeia nome -> função sem argumentos, executada em uma thread do
+    pool (sem contexto do Streamlit: recursos de st.cache_* devem ser obtidos
+    antes). Retorna {nome: QueryResult}, de modo que a latência total é a da
+    consulta mais lenta e não a soma de todas; os tempos vão para o log.
+    """
+    def timed(fn):
+        started = time.perf_counter()
+        try:
+            return QueryResult(fn(), time.perf_counter() - started)
+        except Exception as e:
+            return QueryResult(None, time.perf_counter() - started, e)
+
+    caller = _caller()
+    executor = get_query_executor()
+    futures = {name: executor.submit(timed, fn) for name, fn in tasks.items()}
+    results = {name: future.result() for name, future in futures.items()}
+    _log_concurrent(caller, results)
+    return results
+
+
+def pagamentos_probe_sql(table, columns):
+    """SQL da sonda de mudança: contagem + checksum das colunas exibidas"""
+    return (
+        f"SELECT COUNT(*) AS n, COALESCE(BIT_XOR(CRC32(CONCAT_WS('|', {', '.join(columns)}))), 0) AS checksum "
+        f"FROM {table}"
+    )
+
+
+def probe_pagamentos(table, months, config=None):
+    """Retorna um token (contagem, checksum) que muda sempre que a tabela de pagamentos muda"""
+    layout, _, _ = _payments_settings(config)
+    if layout == 'long':
+        # Colaboradores e períodos: uma sonda por tabela, na mesma ida ao banco
+        sql = (
+            f"{pagamentos_probe_sql(table, ['colaborador_id', 'nome_colaborador'])} UNION ALL "
+            f"{pagamentos_probe_sql(periods_table(table, config), ['colaborador_id', 'period', 'paid_at', 'amount'])}"
+        )
+        rows = fetch_all(sql, config=config)
+        return tuple((int(row['n']), int(row['checksum'])) for row in rows)
+    columns = ['colaborador_id', 'nome_colaborador'] + list(months)
+    row = fetch_all(pagamentos_probe_sql(table, columns), config=config)[0]
+    return int(row['n']), int(row['checksum'])
+
+
+def pagamentos_totals_sql(table, months):
+    """SQL de agregação: uma única linha com a contagem e a soma de cada mês"""
+    sums = ', '.join(f"COALESCE(SUM({mes}), 0) AS {mes}" for mes in months)
+    return f"SELECT COUNT(*) AS colaboradores, {sums} FROM {table}"
+
+
+def pagamentos_period_totals_sql(table, payments_table, n_periods):
+    """SQL de agregação do layout long: GROUP BY period coberto pelo índice (period, colaborador_id)"""
+    placeholders = ', '.join(f":period_{i}" for i in range(n_periods))
+    return (
+        f"SELECT NULL AS period, COUNT(*) AS n FROM {table} UNION ALL "
+        f"SELECT period, COUNT(DISTINCT colaborador_id) FROM {payments_table} "
+        f"WHERE period IN ({placeholders}) GROUP BY period"
+    )
+
+
+def fetch_payment_totals(table, months, config=None):
+    """Totais calculados no MySQL: {'colaboradores': n, '<mes>': pagos, ...}"""
+    layout, _, year = _payments_settings(config)
+    if layout == 'long':
+        periods = payment_periods(months, year)
+        sql = pagamentos_period_totals_sql(table, periods_table(table, config), len(periods))
+        counts = {row['period']: int(row['n'] or 0) for row in fetch_all(sql, _period_params(months, config), config=config)}
+        totals = {'colaboradores': counts.get(None, 0)}
+        totals.update({mes: counts.get(period, 0) for mes, period in periods.items()})
+        return totals
+    row = fetch_all(pagamentos_totals_sql(table, months), config=config)[0]
+    return {key: int(value or 0) for key, value in row.items()}
+
+
+def config_table(config=None):
+    """Tabela de itens/pessoas extras do evento (confra_config por padrão)"""
+    return (config or load_db_config()).get('CONFIG_TABLE', os.getenv('CONFIG_TABLE', 'confra_config'))
+
+
+# Colunas de confra_config cobertas pelo checksum da sonda
+CONFIG_CHECKSUM_COLUMNS = (
+    'id', 'config_type', 'colaborador_id', 'nome_colaborador', 'item', 'quantidade',
+    'unidade', 'observacoes', 'extra_pessoas',
+)
+
+
+def config_probe_sql(table):
+    """SQL da sonda de confra_config: contagem, cursor (maior id/updated_at) e checksum do conteúdo"""
+    return (
+        f"SELECT COUNT(*) AS n, MAX(id) AS max_id, MAX(updated_at) AS max_updated_at, "
+        f"COALESCE(BIT_XOR(CRC32(CONCAT_WS('|', {', '.join(CONFIG_CHECKSUM_COLUMNS)}))), 0) AS checksum "
+        f"FROM {table}"
+    )
+
+
+def probe_config(config=None):
+    """Token de mudança de confra_config: (contagem, maior id, maior updated_at, checksum).
+
+    updated_at tem resolução de segundos: duas edições no mesmo segundo não
+    mudam o maior updated_at, mas mudam o checksum.
+    """
+    row = fetch_all(config_probe_sql(config_table(config)), config=config)[0]
+    return int(row['n']), row['max_id'], row['max_updated_at'], int(row['checksum'])
+
+
+# Chave única de pessoas extras (migrations/003_confra_config_indexes.sql)
+PESSOAS_EXTRAS_KEY = 'uq_config_type_colaborador'
+
+
+def has_pessoas_extras_key(config=None):
+    """True se confra_config já tem a chave única de pessoas extras.
+
+    Sem ela (migração 003 pendente), INSERT ... ON DUPLICATE KEY UPDATE não
+    encontra conflito e cada gravação duplicaria o registro do colaborador.
+    """
+    config = config or load_db_config()
+    row = fetch_all(
+        "SELECT COUNT(*) AS n FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = :schema AND TABLE_NAME = :table AND INDEX_NAME = :key",
+        {'schema': config['DB_NAME'], 'table': config_table(config), 'key': PESSOAS_EXTRAS_KEY},
+        config=config
+    )[0]
+    if not row['n']:
+        logger.warning(
+            "%s.%s sem a chave única %s: rode scripts/migrate.py (pessoas extras gravadas sem upsert)",
+            config['DB_NAME'], config_table(config), PESSOAS_EXTRAS_KEY
+        )
+    return bool(row['n'])
+
+
+def fetch_config_rows(since_id=None, since_updated_at=None, config=None):
+    """Linhas de confra_config; com cursor, apenas as novas ou alteradas desde ele"""
+    table = config_table(config)
+    if since_id is None and since_updated_at is None:
+        return fetch_all(f"SELECT * FROM {table}", config=config)
+
+    sql = f"SELECT * FROM {table} WHERE id > :since_id"
+    params = {'since_id': since_id or 0}
+    if since_updated_at is not None:
+        # >= porque updated_at tem resolução de segundos
+        sql += " OR updated_at >= :since_updated_at"
+        params['since_updated_at'] = since_updated_at
+    return fetch_all(sql, params, config=config)
+
+
+def dispose_engines():
+    """Fecha todas as conexões do pool (útil em testes e no desligamento)"""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
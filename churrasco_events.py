@@ -0,0 +1,84 @@
+"""Eventos (tenants) servidos por uma mesma instalação.
+
+EVENTS lista os ids dos eventos (ex.: 'ti,rh'); o evento é escolhido pela URL
+(?evento=rh) e, sem ele, vale DEFAULT_EVENT. Qualquer configuração do evento
+pode ser sobrescrita com o prefixo EVENT_<ID>_ (ex.: EVENT_RH_DB_TABLE,
+EVENT_RH_EVENT_DATE); o que não for sobrescrito vem das variáveis de sempre.
+
+O evento padrão mantém os nomes antigos de pollers, snapshots em disco e
+pasta de uploads; os demais recebem o id como prefixo/subpasta, de modo que
+caches, versões e avisos de mudança nunca se misturam entre eventos.
+"""
+import os
+
+from churrasco_db import load_db_config
+
+# Configurações que podem variar por evento
+EVENT_KEYS = (
+    'DB_NAME', 'DB_TABLE', 'CONFIG_TABLE', 'PAYMENTS_TABLE', 'PAYMENTS_LAYOUT',
+    'PAYMENT_MONTHS', 'PAYMENT_YEAR', 'PAYMENT_AMOUNT', 'EVENT_DATE', 'EVENT_TIME',
+    'EVENT_TZ', 'EVENT_NAME', 'UPLOAD_FOLDER',
+)
+
+
+def default_event():
+    return os.getenv('DEFAULT_EVENT', 'default')
+
+
+def list_events():
+    """Ids dos eventos configurados (sempre inclui o padrão)"""
+    events = [event.strip() for event in os.getenv('EVENTS', '').split(',') if event.strip()]
+    if default_event() not in events:
+        events.insert(0, default_event())
+    return events
+
+
+def resolve_event(requested=None):
+    """Evento pedido (ex.: ?evento=) se configurado; senão o padrão"""
+    return requested if requested in list_events() else default_event()
+
+
+def event_setting(event, key, default=None):
+    """Valor de `key` para o evento: EVENT_<ID>_<KEY>, depois <KEY>, depois default"""
+    if event != default_event():
+        value = os.getenv(f"EVENT_{event.upper()}_{key}")
+        if value is not None:
+            return value
+    return os.getenv(key, default)
+
+
+def event_overrides(event):
+    """Somente as configurações sobrescritas para o evento (já convertidas)"""
+    if event == default_event():
+        return {}
+    overrides = {}
+    for key in EVENT_KEYS:
+        value = os.getenv(f"EVENT_{event.upper()}_{key}")
+        if value is None:
+            continue
+        if key == 'PAYMENT_MONTHS':
+            value = value.split(',')
+        elif key == 'PAYMENT_YEAR':
+            value = int(value)
+        overrides[key] = value
+    return overrides
+
+
+def event_db_config(event):
+    """Configuração de banco do evento: load_db_config() com as sobrescritas do evento"""
+    return {**load_db_config(), **event_overrides(event), 'EVENT_ID': event}
+
+
+def event_key(event, name):
+    """Nome de poller/snapshot/conjunto no escopo do evento"""
+    return name if event == default_event() else f"{event}.{name}"
+
+
+def event_upload_folder(event):
+    """Pasta de uploads do evento (subpasta do UPLOAD_FOLDER padrão, salvo sobrescrita)"""
+    override = os.getenv(f"EVENT_{event.upper()}_UPLOAD_FOLDER") if event != default_event() else None
+    if override:
+        return override
+    base = os.getenv('UPLOAD_FOLDER', 'uploads')
+    return base if event == default_event() else os.path.join(base, event)
+
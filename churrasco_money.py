@@ -0,0 +1,77 @@
+"""Valores em reais como centavos inteiros (int64), compartilhados pelos três apps.
+
+Contas (somas, totais por colaborador, devido × arrecadado) são feitas em
+centavos: exatas e vetorizáveis com numpy/pandas. A conversão para Decimal
+acontece só na entrada (PAYMENT_AMOUNT) e a formatação pt-BR ("R$ 1.234,56")
+é feita por coluna, formatando cada valor distinto uma única vez.
+"""
+import os
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+import pandas as pd
+
+# Valor mensal por colaborador, quando nem o evento nem o ambiente definem
+DEFAULT_PAYMENT_AMOUNT = '63.07'
+
+
+def to_cents(value) -> int:
+    """Reais (str, int, float ou Decimal) -> centavos, arredondando meio centavo para cima"""
+    return int((Decimal(str(value)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def to_reais(cents):
+    """Centavos -> reais (float), apenas para eixos de gráfico"""
+    return np.asarray(cents, dtype=np.int64) / 100
+
+
+def payment_amount(config=None) -> int:
+    """Valor mensal por colaborador (centavos): PAYMENT_AMOUNT do evento ou do ambiente"""
+    value = (config or {}).get('PAYMENT_AMOUNT') or os.getenv('PAYMENT_AMOUNT', DEFAULT_PAYMENT_AMOUNT)
+    return to_cents(value)
+
+
+def format_brl(cents) -> str:
+    """Centavos -> 'R$ 1.234,56' (pt-BR), sem passar por float"""
+    cents = int(cents)
+    sign = '-' if cents < 0 else ''
+    reais, centavos = divmod(abs(cents), 100)
+    return f"{sign}R$ {reais:,}".replace(',', '.') + f",{centavos:02d}"
+
+
+def format_brl_column(cents):
+    """Formata uma coluna inteira de centavos (mesmo índice se for Series)"""
+    values = np.asarray(cents, dtype=np.int64)
+    uniques, inverse = np.unique(values, return_inverse=True)
+    labels = np.array([format_brl(value) for value in uniques], dtype=object)[inverse.reshape(-1)]
+    if isinstance(cents, pd.Series):
+        return pd.Series(labels, index=cents.index, name=cents.name)
+    return labels
+
+
+def paid_cents(df, months, amount):
+    """Total pago por colaborador (centavos): meses pagos × valor mensal"""
+    return df[months].sum(axis=1).astype(np.int64) * amount
+
+
+def payment_financials(totais, months, amount):
+    """Devido, arrecadado e percentual a partir dos totais por mês (centavos)"""
+    colaboradores = (totais or {}).get('colaboradores') or 0
+    esperados = len(months) * colaboradores
+    pagamentos = sum(int(totais.get(mes, 0)) for mes in months) if colaboradores else 0
+    total_evento = esperados * amount
+    total_arrecadado = pagamentos * amount
+    return {
+        'total_evento': total_evento,
+        'total_arrecadado': total_arrecadado,
+        'total_devido': total_evento - total_arrecadado,
+        'percentual_pago': pagamentos / esperados * 100 if esperados else 0,
+        'colaboradores_count': colaboradores,
+    }
+
+
+def monthly_values(totais, months, amount):
+    """(devido, pago) por mês em centavos, a partir dos totais agregados no banco"""
+    devido = np.full(len(months), int(totais['colaboradores']) * amount, dtype=np.int64)
+    pago = np.array([int(totais.get(mes, 0)) for mes in months], dtype=np.int64) * amount
+    return devido, pago
@@ -0,0 +1,46 @@
+"""Índice da lista de colaboradores, montado uma vez por snapshot.
+
+Reúne as consultas que os formulários fazem a cada rerun (nome por id, rótulos
+do seletor, id por rótulo, posição por id e busca por nome) em dicionários e
+tuplas prontos, no lugar de percorrer o DataFrame a cada uso.
+"""
+from churrasco_search import NameSearchIndex
+
+
+def option_label(nome, colaborador_id):
+    """Rótulo exibido no seletor de colaborador"""
+    return f"{nome} (ID: {colaborador_id})"
+
+
+class RosterIndex:
+    """Consultas O(1) sobre a lista de colaboradores de um snapshot (imutável)"""
+
+    def __init__(self, df):
+        if 'colaborador_id' in df and 'nome_colaborador' in df:
+            ids = [int(cid) for cid in df['colaborador_id'].tolist()]
+            nomes = [str(nome) for nome in df['nome_colaborador'].tolist()]
+        else:
+            ids, nomes = [], []
+        self.ids = tuple(ids)
+        self.names = dict(zip(ids, nomes))
+        self.options = tuple(option_label(nome, cid) for cid, nome in zip(ids, nomes))
+        self.by_label = dict(zip(self.options, ids))
+        self.positions = {cid: pos for pos, cid in enumerate(ids)}
+        self.name_index = NameSearchIndex(nomes)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, colaborador_id):
+        return colaborador_id is not None and int(colaborador_id) in self.positions
+
+    def position(self, colaborador_id, default=0):
+        """Posição do colaborador na lista (índice do seletor); `default` se o id for None ou não estiver na lista"""
+        if colaborador_id is None:
+            return default
+        return self.positions.get(int(colaborador_id), default)
+
+    def select(self, label):
+        """(colaborador_id, nome) a partir do rótulo escolhido no seletor"""
+        colaborador_id = self.by_label[label]
+        return colaborador_id, self.names[colaborador_id]
@@ -0,0 +1,88 @@
+"""Índice de busca por nome, montado uma vez por snapshot da lista de colaboradores.
+
+Os nomes são normalizados (sem acentos, minúsculas, espaços simples) e
+indexados por trigramas: uma busca cruza as menores listas de posições dos
+trigramas da consulta e só confere a substring nesses candidatos. Consultas
+só com palavras de 1-2 letras (menores que um trigrama) conferem a substring
+em todos os nomes, como a busca original ("an" -> "Joana"). Só quando nada
+contém a consulta, a busca aproximada ordena os nomes pela fração de
+trigramas em comum com ela (tolera letras trocadas ou faltando, ex.: "Joao
+Slva" -> "João Silva"); consultas curtas demais não têm busca aproximada.
+"""
+import unicodedata
+from collections import Counter
+
+# Fração mínima de trigramas da consulta presentes no nome (busca aproximada)
+MIN_SIMILARITY = 0.5
+# Máximo de resultados aproximados
+MAX_SIMILAR = 50
+
+
+def fold(text) -> str:
+    """Normaliza para comparação: sem acentos, casefold e espaços simples"""
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.casefold().split())
+
+
+def _grams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class NameSearchIndex:
+    """Índice imutável de uma lista de nomes; buscas retornam posições na lista"""
+
+    def __init__(self, names):
+        self.names = [fold(name) for name in names]
+        postings = {}
+        for pos, name in enumerate(self.names):
+            # Espaços nas bordas marcam início/fim de nome nos trigramas
+            for gram in _grams(f" {name} "):
+                postings.setdefault(gram, []).append(pos)
+        self._postings = {gram: frozenset(positions) for gram, positions in postings.items()}
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query, fuzzy: bool = True) -> list:
+        """Posições dos nomes que contêm todas as palavras da consulta.
+
+        Resultados exatos vêm na ordem da lista; os aproximados, do mais ao
+        menos parecido. Consulta vazia retorna todas as posições.
+        """
+        words = fold(query).split()
+        if not words:
+            return list(range(len(self.names)))
+
+        # Candidatos: interseção das listas de posições dos trigramas, da menor
+        # para a maior, até sobrarem poucos (ou todos os nomes, se todas as
+        # palavras forem curtas); o resto é conferido direto nos nomes candidatos
+        long_words = [word for word in words if len(word) >= 3]
+        if long_words:
+            postings = sorted(
+                (self._postings.get(gram, frozenset()) for word in long_words for gram in _grams(word)), key=len
+            )
+            candidates = postings[0]
+            for positions in postings[1:]:
+                if len(candidates) <= 64:
+                    break
+                candidates = candidates & positions
+        else:
+            candidates = range(len(self.names))
+
+        matches = [
+            pos for pos in sorted(candidates)
+            if all(word in self.names[pos] for word in words)
+        ]
+        if matches or not long_words:
+            return matches
+        return self._similar(' '.join(words)) if fuzzy else []
+
+    def _similar(self, query: str) -> list:
+        grams = _grams(f" {query} ")
+        if not grams:
+            return []
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._postings.get(gram, ()))
+        return [pos for pos, common in counts.most_common(MAX_SIMILAR) if common / len(grams) >= MIN_SIMILARITY]
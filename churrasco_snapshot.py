@@ -0,0 +1,711 @@
+"""Snapshots compartilhados dos dados do churrasco.
+
+Um único thread por processo consulta o banco em intervalo fixo e publica um
+snapshot imutável; todas as sessões do Streamlit apenas leem esse snapshot, de
+modo que a carga no MySQL não cresce com o número de telas abertas.
+
+Cada consulta bem-sucedida também é gravada em disco (Arrow IPC) como último
+snapshot bom, usado para iniciar processos novos instantaneamente e para
+continuar exibindo dados reais quando o banco estiver fora do ar.
+
+Cada snapshot publicado com dados novos (ou mudança de desatualizado) gera um
+aviso no barramento de mudanças do processo (`change_bus`); as sessões só
+reexecutam quando um conjunto que exibem mudou.
+
+Com SNAPSHOT_SERVICE_URL definido, os pollers deixam de consultar o MySQL e
+passam a ler os snapshots publicados pelo serviço local
+(churrasco_snapshot_service.py) via GET condicional com ETag.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, Callable, Optional
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pandas as pd
+
+logger = logging.getLogger('churrasco.snapshot')
+
+DEFAULT_INTERVAL = 60
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', '.snapshots')
+SNAPSHOT_MEDIA_TYPE = 'application/vnd.apache.arrow.file'
+
+
+def snapshot_service_url() -> str:
+    """URL do serviço de snapshots (lida na hora: os apps carregam o .env depois dos imports)"""
+    return os.getenv('SNAPSHOT_SERVICE_URL', '').rstrip('/')
+
+
+def _service_timeout() -> float:
+    return float(os.getenv('SNAPSHOT_SERVICE_TIMEOUT', 5))
+
+
+class ChangeBus:
+    """Pub/sub em memória do processo.
+
+    Cada publicação incrementa a versão do tópico e acorda quem está esperando;
+    leitores comparam as versões que já viram, sem consultar o banco.
+    """
+
+    def __init__(self):
+        self._versions = {}
+        self._changed = threading.Condition()
+
+    def publish(self, topic: str) -> int:
+        with self._changed:
+            self._versions[topic] = self._versions.get(topic, 0) + 1
+            self._changed.notify_all()
+            return self._versions[topic]
+
+    def version(self, topic: str) -> int:
+        return self._versions.get(topic, 0)
+
+    def versions(self, topics) -> tuple:
+        return tuple(self._versions.get(topic, 0) for topic in topics)
+
+    def wait(self, topics, seen: tuple, timeout: float) -> tuple:
+        """Bloqueia até alguma versão diferir de `seen` (ou o tempo acabar)"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.versions(topics) != seen, timeout)
+            return self.versions(topics)
+
+
+change_bus = ChangeBus()
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """Resultado de uma consulta publicada pelo poller (não deve ser alterado)"""
+    data: Any
+    fetched_at: datetime
+    version: int
+    error: Optional[str] = None
+    from_disk: bool = False
+
+    @property
+    def is_stale(self) -> bool:
+        """True quando os dados não vêm de uma consulta recente bem-sucedida"""
+        return self.from_disk or self.error is not None
+
+
+def snapshot_path(name: str) -> str:
+    return os.path.join(SNAPSHOT_DIR, f"{name}.arrow")
+
+
+def _dtype_name(dtype) -> str:
+    """Nome do dtype aceito por astype, incluindo o armazenamento de strings"""
+    if isinstance(dtype, pd.StringDtype):
+        return f"string[{dtype.storage}]"
+    return str(dtype)
+
+
+def _to_table(data: Any, fetched_at: datetime):
+    """Tabela Arrow com o tipo do resultado, o horário da consulta e os dtypes nos metadados"""
+    import pyarrow as pa
+
+    metadata = {}
+    if isinstance(data, dict):
+        kind, table = 'dict', pa.Table.from_pylist([data])
+    elif isinstance(data, pd.DataFrame):
+        kind, table = 'frame', pa.Table.from_pandas(data, preserve_index=False)
+        # Dtypes compactos (int8, category, string[pyarrow]) restaurados na leitura
+        metadata[b'churrasco.dtypes'] = json.dumps({
+            str(column): _dtype_name(dtype) for column, dtype in data.dtypes.items()
+        }).encode()
+    else:
+        # from_pylist preserva inteiros com NULL, datas e decimais sem passar pelo pandas
+        kind, table = 'records', pa.Table.from_pylist(list(data))
+
+    metadata = {**(table.schema.metadata or {}), **metadata}
+    metadata[b'churrasco.kind'] = kind.encode()
+    metadata[b'churrasco.fetched_at'] = fetched_at.isoformat().encode()
+    return table.replace_schema_metadata(metadata)
+
+
+def _restore_dtypes(df, dtypes: dict):
+    """Reaplica os dtypes gravados por _to_table às colunas que voltaram diferentes"""
+    for column, name in dtypes.items():
+        if column in df.columns and _dtype_name(df[column].dtype) != name:
+            df[column] = df[column].astype(name)
+    return df
+
+
+def _from_table(table):
+    """Inverso de _to_table: retorna (dados, fetched_at)"""
+    metadata = table.schema.metadata or {}
+    kind = metadata.get(b'churrasco.kind', b'frame').decode()
+    fetched_at = datetime.fromisoformat(metadata[b'churrasco.fetched_at'].decode())
+
+    if kind == 'dict':
+        data = table.to_pylist()[0]
+    elif kind == 'records':
+        data = tuple(table.to_pylist())
+    else:
+        data = table.to_pandas()
+        if b'churrasco.dtypes' in metadata:
+            data = _restore_dtypes(data, json.loads(metadata[b'churrasco.dtypes']))
+    return data, fetched_at
+
+
+def _write_options():
+    import pyarrow as pa
+
+    compression = 'zstd' if pa.Codec.is_available('zstd') else None
+    return pa.ipc.IpcWriteOptions(compression=compression)
+
+
+def encode_snapshot(data: Any, fetched_at: datetime) -> bytes:
+    """Serializa um resultado em Arrow IPC (formato de arquivo, compactado com zstd)"""
+    import pyarrow as pa
+
+    table = _to_table(data, fetched_at)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema, options=_write_options()) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def decode_snapshot(payload: bytes):
+    """Lê um resultado serializado por encode_snapshot: retorna (dados, fetched_at)"""
+    import pyarrow as pa
+
+    return _from_table(pa.ipc.open_file(pa.py_buffer(payload)).read_all())
+
+
+def save_last_good(name: str, data: Any, fetched_at: datetime):
+    """Grava o último resultado bom em disco (Arrow IPC, escrita atômica)"""
+    import pyarrow as pa
+
+    table = _to_table(data, fetched_at)
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    path = snapshot_path(name)
+    # Arquivo temporário exclusivo: sessões e threads podem gravar o mesmo nome ao mesmo tempo
+    fd, tmp_path = tempfile.mkstemp(prefix=f"{name}.", suffix='.tmp', dir=SNAPSHOT_DIR)
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema, options=_write_options()) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_last_good(name: str) -> Optional[Snapshot]:
+    """Lê o último snapshot bom gravado em disco, se existir"""
+    path = snapshot_path(name)
+    if not os.path.exists(path):
+        return None
+    import pyarrow as pa
+
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    data, fetched_at = _from_table(table)
+    return Snapshot(data=data, fetched_at=fetched_at, version=1, from_disk=True)
+
+
+def _same_data(new, old):
+    """Compara dois resultados de consulta (DataFrames usam .equals)"""
+    try:
+        if hasattr(new, 'equals'):
+            return new.equals(old)
+        return new == old
+    except Exception:
+        return False
+
+
+class SnapshotPoller:
+    """Thread em segundo plano que mantém o snapshot mais recente de uma consulta"""
+
+    def __init__(self, name: str, fetch: Callable[[], Any], interval: float = DEFAULT_INTERVAL,
+                 probe: Optional[Callable[[], Any]] = None, persist: bool = False,
+                 idle_timeout: Optional[float] = None):
+        self.name = name
+        self.fetch = fetch
+        self.interval = interval
+        # Sonda barata: se o token não mudou, os dados não são relidos
+        self.probe = probe
+        # Grava cada resultado bom em disco e parte dele ao iniciar
+        self.persist = persist
+        # Sem leituras por idle_timeout (s), o thread para até a próxima leitura
+        self.idle_timeout = idle_timeout
+        self._last_read = time.monotonic()
+        self._token = None
+        self.last_checked: Optional[datetime] = None
+        self._snapshot: Optional[Snapshot] = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        # Serializa refresh/_publish: o thread do poller e chamadas externas
+        # (POST /refresh, escritas locais) nunca publicam a mesma versão duas vezes
+        self._refresh_lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+        # Recriado após descarte: as versões continuam de onde o anterior parou
+        self.version_base = 0
+        # Descartado do registro (get_poller): leituras vão para o poller atual
+        self.retired = False
+
+    def start(self):
+        """Inicia o thread do poller (idempotente)"""
+        with self._lock:
+            if self._snapshot is None and self.persist:
+                self._boot_from_disk()
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name=f"snapshot-{self.name}", daemon=True
+                )
+                self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _boot_from_disk(self):
+        try:
+            snapshot = load_last_good(self.name)
+        except Exception as e:
+            logger.warning("Snapshot em disco de %s ilegível: %s", self.name, e)
+            return
+        if snapshot is not None:
+            with self._refresh_lock:
+                if self._snapshot is None:
+                    self._publish(replace(snapshot, version=self._next_version(None)))
+
+    def _next_version(self, previous: Optional[Snapshot]) -> int:
+        return previous.version + 1 if previous else self.version_base + 1
+
+    def _publish(self, snapshot: Snapshot):
+        previous = self._snapshot
+        self._snapshot = snapshot
+        self._ready.set()
+        if previous is None or (previous.version, previous.is_stale) != (snapshot.version, snapshot.is_stale):
+            change_bus.publish(self.name)
+        return snapshot
+
+    def refresh(self):
+        """Executa uma consulta agora e publica o novo snapshot (se os dados mudaram)"""
+        with self._refresh_lock:
+            return self._refresh()
+
+    def _refresh(self):
+        previous = self._snapshot
+        try:
+            token = self.probe() if self.probe else None
+            self.last_checked = datetime.now()
+            if token is not None and token == self._token and previous and not previous.is_stale:
+                # Nada mudou: o snapshot atual (e tudo derivado dele) continua válido
+                return previous
+            data = self.fetch()
+            self._token = token
+        except Exception as e:
+            if previous is None:
+                return self._publish(Snapshot(data=None, fetched_at=datetime.now(), version=self._next_version(None), error=str(e)))
+            # Mantém os últimos dados bons (e o horário deles) e registra o erro
+            return self._publish(replace(previous, error=str(e)))
+
+        now = datetime.now()
+        if previous and _same_data(data, previous.data):
+            if not previous.is_stale:
+                # Sem sonda (ou sonda mudou à toa): dados idênticos mantêm a versão
+                return previous
+            snapshot = Snapshot(data=previous.data, fetched_at=now, version=previous.version)
+        else:
+            snapshot = Snapshot(data=data, fetched_at=now, version=self._next_version(previous))
+
+        if self.persist:
+            try:
+                save_last_good(self.name, snapshot.data, now)
+            except Exception as e:
+                logger.warning("Falha ao gravar snapshot de %s: %s", self.name, e)
+        return self._publish(snapshot)
+
+    def touch(self):
+        """Registra uma leitura (ou um observador ativo) e reativa o thread se estava parado.
+
+        Retorna o poller a usar: se esta instância já foi descartada do
+        registro, o poller atual do nome (recriado se preciso), para que quem
+        guardou a instância antiga nunca reative uma cópia paralela.
+        """
+        if self.retired:
+            return get_poller(self.name, self.fetch, self.interval, probe=self.probe, persist=self.persist)
+        self._last_read = time.monotonic()
+        if self._thread is None or not self._thread.is_alive():
+            self.start()
+        return self
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Snapshot]:
+        """Retorna o snapshot atual, aguardando o primeiro carregamento se necessário"""
+        current = self.touch()
+        if current is not self:
+            return current.get(timeout)
+        if self._snapshot is None:
+            self._ready.wait(timeout)
+        return self._snapshot
+
+    def peek(self) -> Optional[Snapshot]:
+        """Snapshot atual sem contar como leitura (não reativa um poller parado)"""
+        return self._snapshot
+
+    @property
+    def is_idle(self) -> bool:
+        return self._thread is None or not self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self.idle_timeout and time.monotonic() - self._last_read > self.idle_timeout:
+                # Evento sem telas abertas: não consulta o banco até alguém voltar a ler
+                logger.info("Poller %s parado por inatividade", self.name)
+                return
+            started = time.monotonic()
+            self.refresh()
+            elapsed = time.monotonic() - started
+            self._stop.wait(max(0.0, self.interval - elapsed))
+
+
+class RemoteSnapshotPoller(SnapshotPoller):
+    """Leitor de um conjunto publicado pelo serviço de snapshots.
+
+    Mesma interface do SnapshotPoller, mas cada atualização é um GET
+    condicional (If-None-Match) em long-poll: o serviço só responde quando a
+    versão muda ou após `wait` segundos, com um 304 sem corpo. A versão local só avança quando chegam dados
+    novos, então os caches derivados continuam válidos entre reinícios do serviço.
+    """
+
+    def __init__(self, name: str, base_url: str, interval: Optional[float] = None):
+        if interval is None:
+            interval = float(os.getenv('SNAPSHOT_SERVICE_POLL', 1))
+        super().__init__(name, fetch=None, interval=interval)
+        self.long_poll = float(os.getenv('SNAPSHOT_SERVICE_WAIT', 25))
+        self.url = f"{base_url}/snapshot/{name}"
+        self._etag = None
+
+    @staticmethod
+    def _status_from_headers(headers):
+        fetched_at = headers.get('X-Fetched-At')
+        return {
+            'fetched_at': datetime.fromisoformat(fetched_at) if fetched_at else datetime.now(),
+            'error': headers.get('X-Snapshot-Error') or None,
+            'from_disk': headers.get('X-Snapshot-From-Disk') == '1',
+        }
+
+    def refresh(self, wait: bool = True):
+        """Atualiza a partir do serviço.
+
+        wait=False (usado após escritas locais): GET condicional sem long-poll,
+        e, se o thread do poller estiver num long-poll, não espera por ele — o
+        long-poll em andamento já responde assim que o serviço publicar a
+        nova versão.
+        """
+        if wait:
+            return super().refresh()
+        if not self._refresh_lock.acquire(blocking=False):
+            return self._snapshot
+        try:
+            return self._refresh(long_poll=False)
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh(self, long_poll: bool = True):
+        previous = self._snapshot
+        headers = {'Accept': SNAPSHOT_MEDIA_TYPE}
+        url, timeout = self.url, _service_timeout()
+        if previous is not None and self._etag:
+            headers['If-None-Match'] = self._etag
+            if long_poll and not previous.is_stale:
+                # Long-poll: o serviço segura o 304 até a versão mudar (aviso quase imediato)
+                url, timeout = f"{url}?wait={self.long_poll:g}", timeout + self.long_poll
+        try:
+            with urlopen(Request(url, headers=headers), timeout=timeout) as response:
+                payload = response.read()
+                etag = response.headers.get('ETag')
+                status = self._status_from_headers(response.headers)
+        except HTTPError as e:
+            self.last_checked = datetime.now()
+            if e.code == 304 and previous is not None:
+                # Mesma versão no serviço: atualiza só horário/estado
+                return self._publish(replace(previous, **self._status_from_headers(e.headers)))
+            error = e.headers.get('X-Snapshot-Error') or f"HTTP {e.code}"
+            return self._fail(previous, f"Serviço de snapshots: {error}")
+        except Exception as e:
+            return self._fail(previous, f"Serviço de snapshots indisponível: {e}")
+
+        self.last_checked = datetime.now()
+        data, _ = decode_snapshot(payload)
+        self._etag = etag
+        return self._publish(Snapshot(data=data, version=self._next_version(previous), **status))
+
+    def _fail(self, previous, error):
+        if previous is None:
+            return self._publish(Snapshot(data=None, fetched_at=datetime.now(), version=self._next_version(None), error=error))
+        return self._publish(replace(previous, error=error))
+
+
+class ConfigTableCache:
+    """Espelho em memória de confra_config, atualizado de forma incremental.
+
+    A cada carga roda a sonda (contagem, maior id, maior updated_at, checksum);
+    se nada mudou, reaproveita as linhas. Caso contrário busca apenas as linhas com id ou
+    updated_at além do cursor e só relê a tabela inteira quando a contagem
+    indica exclusões. Escritas feitas pelo próprio processo são aplicadas
+    diretamente no espelho (write-through), sem nova leitura da tabela.
+    """
+
+    def __init__(self, probe: Callable[[], Any], fetch_since: Callable[[Any, Any], list]):
+        self.probe = probe
+        self.fetch_since = fetch_since
+        self.version = 0
+        self._token = None
+        self._rows = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Retorna (versão, linhas ordenadas por id) após sincronizar com o banco"""
+        with self._lock:
+            token = self.probe()
+            if token == self._token:
+                return self.version, list(self._rows.values())
+
+            count = token[0]
+            if self._token is None or count < self._token[0]:
+                rows = {row['id']: row for row in self.fetch_since(None, None)}
+            else:
+                _, max_id, max_updated_at, _ = self._token
+                rows = dict(self._rows)
+                for row in self.fetch_since(max_id, max_updated_at):
+                    rows[row['id']] = row
+                if len(rows) != count:
+                    # Houve exclusões junto com inserções: releitura completa
+                    rows = {row['id']: row for row in self.fetch_since(None, None)}
+
+            self._rows = dict(sorted(rows.items()))
+            self._token = token
+            self.version += 1
+            return self.version, list(self._rows.values())
+
+    def apply(self, rows=(), deleted_ids=()):
+        """Aplica no espelho linhas gravadas/relidas e ids excluídos pelo processo"""
+        with self._lock:
+            if self._token is None:
+                # Espelho ainda vazio: a próxima carga lê tudo de qualquer forma
+                return self.version
+            patched = dict(self._rows)
+            for row_id in deleted_ids:
+                patched.pop(row_id, None)
+            for row in rows:
+                patched[row['id']] = row
+            self._rows = dict(sorted(patched.items()))
+            # Cursor do espelho atual; o checksum só o banco calcula, então a
+            # próxima carga confere com uma leitura incremental a partir do cursor
+            self._token = (
+                len(self._rows),
+                max(self._rows, default=None),
+                max((row['updated_at'] for row in self._rows.values() if row.get('updated_at')), default=None),
+                None,
+            )
+            self.version += 1
+            return self.version
+
+
+@dataclass
+class _CacheEntry:
+    value: Any
+    loaded_at: float
+    version: Any = None
+    refreshing: bool = False
+    error: Optional[str] = None
+
+
+class StaleWhileRevalidate:
+    """Cache stale-while-revalidate com limite de defasagem.
+
+    Dentro de `ttl` o valor é servido direto. Entre `ttl` e `max_staleness` o
+    valor anterior é servido imediatamente e uma atualização roda em segundo
+    plano. Só acima de `max_staleness` (ou sem valor algum) a leitura espera o
+    banco. O loader recebe o valor anterior (ou None) e devolve o novo.
+
+    A chave é estável por conjunto; `version` (opcional) identifica os dados
+    de origem. Quando ela muda, o valor anterior continua sendo servido e a
+    releitura vai para segundo plano, como num TTL vencido: uma mudança nos
+    dados não faz todas as sessões esperarem o banco ao mesmo tempo. Quando a
+    releitura de uma versão nova termina, `topic` é publicado no change_bus
+    para que as telas reexecutem e a exibam.
+
+    Cargas da mesma chave não se repetem em paralelo: quem chega durante uma
+    carga em andamento espera o resultado dela (uma consulta por chave, não
+    uma por sessão).
+    """
+
+    def __init__(self, ttl: float = DEFAULT_INTERVAL, max_staleness: float = 600, max_entries: int = 32,
+                 topic: Optional[str] = None):
+        self.ttl = ttl
+        self.max_staleness = max(ttl, max_staleness)
+        self.max_entries = max_entries
+        self.topic = topic
+        self._entries: "OrderedDict[Any, _CacheEntry]" = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, loader: Callable[[Any], Any], version=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        age = time.monotonic() - entry.loaded_at if entry else None
+
+        if entry is None or age >= self.max_staleness:
+            return self._load(key, loader, entry, version)
+
+        if age >= self.ttl or entry.version != version:
+            with self._lock:
+                start = not entry.refreshing
+                entry.refreshing = True
+            if start:
+                threading.Thread(
+                    target=self._refresh, args=(key, loader, entry, version), name="swr-refresh", daemon=True
+                ).start()
+        return entry.value
+
+    def age(self, key) -> Optional[float]:
+        """Idade (s) do valor em cache para a chave, ou None"""
+        entry = self._entries.get(key)
+        return time.monotonic() - entry.loaded_at if entry else None
+
+    def _load(self, key, loader, previous: Optional[_CacheEntry], version=None):
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = Future()
+        if not leader:
+            # Outra sessão/thread já está carregando esta chave
+            return flight.result()
+
+        try:
+            value = loader(previous.value if previous else None)
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            flight.set_exception(e)
+            raise
+        with self._lock:
+            self._entries[key] = _CacheEntry(value=value, loaded_at=time.monotonic(), version=version)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+        flight.set_result(value)
+        return value
+
+    def _refresh(self, key, loader, entry: _CacheEntry, version=None):
+        try:
+            self._load(key, loader, entry, version)
+        except Exception as e:
+            # Mantém o valor anterior; a próxima leitura tenta de novo
+            logger.warning("Atualização em segundo plano falhou para %s: %s", key, e)
+            with self._lock:
+                entry.error = str(e)
+                entry.refreshing = False
+            return
+        if self.topic and version != entry.version:
+            change_bus.publish(self.topic)
+
+
+class DatasetVersions:
+    """Versão por conjunto de dados do processo.
+
+    Os caches usam a versão como parte da chave; uma escrita incrementa apenas a
+    versão do conjunto afetado, sem invalidar os demais.
+    """
+
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> int:
+        return self._versions.get(name, 0)
+
+    def bump(self, name: str) -> int:
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+            version = self._versions[name]
+        # Outras sessões do processo que exibem o conjunto reexecutam
+        change_bus.publish(f"dataset:{name}")
+        return version
+
+
+dataset_versions = DatasetVersions()
+
+# Um poller por nome em cada processo
+_pollers = {}
+_pollers_lock = threading.Lock()
+# Última versão de cada poller descartado: o substituto continua a numeração
+_retired_versions = {}
+
+
+def _evict_idle_pollers():
+    """Mantém no máximo SNAPSHOT_MAX_POLLERS, descartando primeiro os parados há mais tempo.
+
+    O descartado é marcado como aposentado (leituras por ele voltam ao
+    registro) e a versão dele é guardada: quem comparava versões ou acompanha
+    o tópico no change_bus continua vendo uma sequência crescente.
+    """
+    limit = int(os.getenv('SNAPSHOT_MAX_POLLERS', 64))
+    idle = sorted((poller for poller in _pollers.values() if poller.is_idle), key=lambda poller: poller._last_read)
+    for poller in idle[:max(0, len(_pollers) - limit + 1)]:
+        poller.retired = True
+        snapshot = poller.peek()
+        _retired_versions[poller.name] = max(poller.version_base, snapshot.version if snapshot else 0)
+        del _pollers[poller.name]
+
+
+def get_poller(name: str, fetch: Callable[[], Any], interval: float = DEFAULT_INTERVAL,
+               probe: Optional[Callable[[], Any]] = None, persist: bool = False) -> SnapshotPoller:
+    """Retorna o poller compartilhado do processo, iniciando-o na primeira chamada.
+
+    Cada chamada conta como leitura: telas que só observam o barramento de
+    mudanças chamam get_poller a cada verificação e mantêm o poller ativo.
+
+    Com o serviço de snapshots configurado, o poller apenas lê o conjunto `name`
+    publicado por ele (fetch/probe não são usados).
+    """
+    poller = _pollers.get(name)
+    if poller is None:
+        with _pollers_lock:
+            poller = _pollers.get(name)
+            if poller is None:
+                _evict_idle_pollers()
+                if snapshot_service_url():
+                    poller = RemoteSnapshotPoller(name, snapshot_service_url())
+                else:
+                    poller = SnapshotPoller(name, fetch, interval, probe=probe, persist=persist)
+                poller.idle_timeout = float(os.getenv('SNAPSHOT_IDLE_TIMEOUT', 600)) or None
+                poller.version_base = _retired_versions.pop(name, 0)
+                _pollers[name] = poller
+    return poller.touch()
+
+
+def request_refresh(name: str):
+    """Pede ao serviço de snapshots que releia um conjunto agora (após escritas locais)"""
+    base_url = snapshot_service_url()
+    if not base_url:
+        return
+    try:
+        request = Request(f"{base_url}/refresh/{name}", data=b'', method='POST')
+        with urlopen(request, timeout=_service_timeout()):
+            pass
+    except Exception as e:
+        logger.warning("Falha ao pedir atualização de %s ao serviço de snapshots: %s", name, e)
+    poller = _pollers.get(name)
+    if isinstance(poller, RemoteSnapshotPoller):
+        # Sem long-poll: a escrita não espera SNAPSHOT_SERVICE_WAIT se a versão não mudou
+        poller.refresh(wait=False)
@@ -0,0 +1,224 @@
+"""Serviço local de snapshots do churrasco.
+
+Processo único que mantém a conexão com o MySQL, consulta pagamentos, totais e
+confra_config em intervalo fixo e serve o snapshot atual de cada conjunto por
+HTTP em localhost. Os apps Streamlit (app.py, app_1.py e o dashboard) apontam
+SNAPSHOT_SERVICE_URL para cá e passam a apenas ler, de modo que o número de
+réplicas não multiplica a carga no banco.
+
+Todos os eventos de EVENTS são servidos pelo mesmo processo; conjuntos de
+eventos sem leitores param de consultar o banco (SNAPSHOT_IDLE_TIMEOUT).
+
+Rotas:
+    GET  /snapshot/<nome>  Arrow IPC (zstd) com ETag; If-None-Match -> 304
+                           (?wait=<s> segura o 304 até a versão mudar;
+                           <nome> = [<evento>.]confra_pagamentos etc.)
+    POST /refresh/<nome>   relê o conjunto agora (usado após escritas)
+    GET  /health           JSON com versão/idade de cada conjunto e o circuito
+
+Uso:
+    python churrasco_snapshot_service.py [--host 127.0.0.1] [--port 8765]
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from churrasco_db import (
+    breaker_statuses, fetch_config_rows, fetch_payment_totals, probe_config, probe_pagamentos, read_roster,
+)
+from churrasco_events import event_db_config, event_key, list_events
+from churrasco_snapshot import SNAPSHOT_MEDIA_TYPE, ConfigTableCache, SnapshotPoller, change_bus, encode_snapshot
+
+logger = logging.getLogger('churrasco.snapshot_service')
+
+# Identifica esta execução: ETags de execuções anteriores nunca coincidem
+BOOT_ID = f"{int(time.time()):x}"
+# Limite do long-poll (s)
+MAX_WAIT = 60
+
+
+def build_pollers(event, interval):
+    """Pollers de cada conjunto servido para um evento, com os mesmos nomes usados pelos apps"""
+    config = event_db_config(event)
+    idle_timeout = float(os.getenv('SNAPSHOT_IDLE_TIMEOUT', 600)) or None
+    table = f"{config['DB_NAME']}.{config['DB_TABLE']}"
+    months = config['PAYMENT_MONTHS']
+    config_table = ConfigTableCache(
+        probe=lambda: probe_config(config),
+        fetch_since=lambda since_id, since_updated_at: fetch_config_rows(since_id, since_updated_at, config=config)
+    )
+    pollers = [
+        SnapshotPoller(
+            event_key(event, 'confra_pagamentos'),
+            lambda: read_roster(table, months, config=config),
+            interval, probe=lambda: probe_pagamentos(table, months, config=config), persist=True,
+            idle_timeout=idle_timeout
+        ),
+        SnapshotPoller(
+            event_key(event, 'confra_pagamentos_totais'),
+            lambda: fetch_payment_totals(table, months, config=config),
+            interval, persist=True, idle_timeout=idle_timeout
+        ),
+        SnapshotPoller(
+            event_key(event, 'confra_config'),
+            lambda: tuple(config_table.load()[1]),
+            interval, persist=True, idle_timeout=idle_timeout
+        ),
+    ]
+    return {poller.name: poller for poller in pollers}
+
+
+class EncodedSnapshots:
+    """Corpo serializado da versão atual de cada conjunto (codificado uma vez por versão)"""
+
+    def __init__(self):
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    def get(self, name, snapshot):
+        with self._lock:
+            cached = self._bodies.get(name)
+            if cached is not None and cached[0] == snapshot.version:
+                return cached[1]
+        body = encode_snapshot(snapshot.data, snapshot.fetched_at)
+        with self._lock:
+            self._bodies[name] = (snapshot.version, body)
+        return body
+
+
+def _header_value(text):
+    """Cabeçalhos HTTP são latin-1 de uma linha"""
+    return ' '.join(str(text).split()).encode('latin-1', 'replace').decode('latin-1')
+
+
+class SnapshotRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'ChurrascoSnapshot/1.0'
+    pollers = {}
+    bodies = EncodedSnapshots()
+
+    def _dataset(self, prefix):
+        name = self.path.split('?', 1)[0][len(prefix):]
+        poller = self.pollers.get(name)
+        if poller is None:
+            self.send_error(404, f"Conjunto desconhecido: {name}")
+        return name, poller
+
+    def _send_status_headers(self, snapshot):
+        self.send_header('ETag', f'"{BOOT_ID}-{snapshot.version}"')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Snapshot-Version', str(snapshot.version))
+        self.send_header('X-Fetched-At', snapshot.fetched_at.isoformat())
+        self.send_header('X-Snapshot-From-Disk', '1' if snapshot.from_disk else '0')
+        if snapshot.error:
+            self.send_header('X-Snapshot-Error', _header_value(snapshot.error))
+
+    def do_GET(self):
+        if self.path == '/health':
+            return self._send_health()
+        if not self.path.startswith('/snapshot/'):
+            return self.send_error(404)
+
+        name, poller = self._dataset('/snapshot/')
+        if poller is None:
+            return
+        seen = change_bus.versions([name])
+        snapshot = poller.get(timeout=10)
+        if snapshot is None or snapshot.data is None:
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            if snapshot is not None and snapshot.error:
+                self.send_header('X-Snapshot-Error', _header_value(snapshot.error))
+            self.end_headers()
+            return
+
+        etag = f'"{BOOT_ID}-{snapshot.version}"'
+        wait = float(parse_qs(urlsplit(self.path).query).get('wait', ['0'])[0])
+        if self.headers.get('If-None-Match') == etag and wait > 0:
+            # Long-poll: responde assim que o poller publicar outra versão
+            change_bus.wait([name], seen, min(wait, MAX_WAIT))
+            snapshot = poller.get()
+            etag = f'"{BOOT_ID}-{snapshot.version}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self._send_status_headers(snapshot)
+            self.end_headers()
+            return
+
+        body = self.bodies.get(name, snapshot)
+        self.send_response(200)
+        self.send_header('Content-Type', SNAPSHOT_MEDIA_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self._send_status_headers(snapshot)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self.path.startswith('/refresh/'):
+            return self.send_error(404)
+        name, poller = self._dataset('/refresh/')
+        if poller is None:
+            return
+        snapshot = poller.refresh()
+        self.send_response(204)
+        self._send_status_headers(snapshot)
+        self.end_headers()
+
+    def _send_health(self):
+        now = datetime.now()
+        datasets = {}
+        for name, poller in self.pollers.items():
+            snapshot = poller.peek()
+            datasets[name] = None if snapshot is None else {
+                'idle': poller.is_idle,
+                'version': snapshot.version,
+                'age_seconds': round((now - snapshot.fetched_at).total_seconds(), 1),
+                'stale': snapshot.is_stale,
+                'error': snapshot.error,
+            }
+        body = json.dumps({'boot_id': BOOT_ID, 'breakers': breaker_statuses(), 'datasets': datasets}, default=str).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s %s", self.address_string(), format % args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serviço local de snapshots do churrasco")
+    parser.add_argument('--host', default=os.getenv('SNAPSHOT_SERVICE_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('SNAPSHOT_SERVICE_PORT', 8765)))
+    parser.add_argument('--interval', type=float, default=float(os.getenv('DB_REFRESH_INTERVAL', 5)))
+    args = parser.parse_args()
+
+    pollers = {}
+    for event in list_events():
+        pollers.update(build_pollers(event, args.interval))
+    SnapshotRequestHandler.pollers = pollers
+    for poller in pollers.values():
+        poller.start()
+
+    server = ThreadingHTTPServer((args.host, args.port), SnapshotRequestHandler)
+    logger.info("Serviço de snapshots em http://%s:%s", args.host, args.port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
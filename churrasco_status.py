@@ -0,0 +1,63 @@
+"""Rótulos de status de pagamento (colaborador × mês) calculados de uma vez.
+
+A matriz inteira sai de uma única operação vetorizada sobre as colunas de mês
+(pago / vencido / a vencer, comparando o número de cada mês com o mês atual) e
+cada coluna vira um Categorical: poucos rótulos distintos, serializados pelo
+Arrow como dicionário. As cores ficam no próprio rótulo (emoji), de modo que a
+tabela é exibida direto com st.dataframe + column_config, sem Styler.
+
+Os apps guardam o resultado em cache por versão do snapshot e mês atual.
+"""
+import numpy as np
+import pandas as pd
+
+from churrasco_db import MONTH_NUMBERS
+
+# Códigos da matriz de status
+PAID, DUE, UPCOMING = 0, 1, 2
+
+
+def month_number(mes):
+    """Número do mês de uma coluna 'agosto_pago' (None se não for um mês)"""
+    return MONTH_NUMBERS.get(mes.split('_')[0])
+
+
+def month_label(mes):
+    """Cabeçalho de exibição: 'agosto_pago' -> 'Agosto'"""
+    return mes.replace('_pago', '').title()
+
+
+def headline_month(months, current_month):
+    """Coluna do mês em destaque: a do mês atual, se configurada; senão a primeira"""
+    for mes in months:
+        if month_number(mes) == current_month:
+            return mes
+    return months[0] if months else None
+
+
+def status_codes(df, months, current_month):
+    """Matriz (colaboradores × meses) de PAID/DUE/UPCOMING em uma passada.
+
+    Meses não pagos até o mês atual (ou sem número reconhecido) contam como
+    vencidos; os seguintes, como a vencer.
+    """
+    values = df[months].to_numpy()
+    numbers = np.array([month_number(mes) or 0 for mes in months])
+    due = numbers <= current_month
+    return np.where(values == 1, PAID, np.where(due, DUE, UPCOMING)).astype(np.int8)
+
+
+def status_table(df, months, labels, current_month, columns=None):
+    """DataFrame de rótulos por mês (Categorical), com as colunas extras de `columns`.
+
+    labels = (pago, vencido, a vencer), podendo repetir rótulos; o índice de
+    `df` é preservado, então filtros feitos por posição/índice no roster valem
+    também para a tabela.
+    """
+    categories = list(dict.fromkeys(labels))
+    remap = np.array([categories.index(label) for label in labels], dtype=np.int8)
+    codes = remap[status_codes(df, months, current_month)]
+    table = {name: df[source].to_numpy() for name, source in (columns or {}).items()}
+    for i, mes in enumerate(months):
+        table[mes] = pd.Categorical.from_codes(codes[:, i], categories=categories)
+    return pd.DataFrame(table, index=df.index)
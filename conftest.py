@@ -0,0 +1 @@
+"""Raiz do repositório no sys.path dos testes (módulos churrasco_* ficam na raiz)."""
@@ -1,5 +1,5 @@
--- Create confra_config table to replace JSON functionality
-CREATE TABLE IF NOT EXISTS u629942907_glpi.confra_config (
+-- Tabela confra_config (itens e pessoas extras), substitui o antigo JSON
+CREATE TABLE IF NOT EXISTS {config_table} (
     id INT AUTO_INCREMENT PRIMARY KEY,
     config_type ENUM('item', 'pessoas_extras') NOT NULL,
     colaborador_id INT,
@@ -0,0 +1,14 @@
+-- Tabela de pagamentos no layout wide (uma coluna por mês); já existe nas
+-- instalações antigas, então só é criada quando falta
+CREATE TABLE IF NOT EXISTS {payments_table} (
+    colaborador_id INT PRIMARY KEY,
+    nome_colaborador VARCHAR(255) NOT NULL,
+    agosto_pago TINYINT(1) NOT NULL DEFAULT 0,
+    setembro_pago TINYINT(1) NOT NULL DEFAULT 0,
+    outubro_pago TINYINT(1) NOT NULL DEFAULT 0,
+    novembro_pago TINYINT(1) NOT NULL DEFAULT 0,
+    dezembro_pago TINYINT(1) NOT NULL DEFAULT 0
+);
+
+-- Lista de colaboradores é lida em ORDER BY nome_colaborador
+ALTER TABLE {payments_table} ADD INDEX idx_nome_colaborador (nome_colaborador);
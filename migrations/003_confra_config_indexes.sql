@@ -0,0 +1,24 @@
+-- Pessoas extras duplicadas por colaborador: mantém só a linha mais recente
+DELETE older FROM {config_table} older
+JOIN {config_table} newer
+    ON newer.config_type = 'pessoas_extras'
+    AND older.config_type = 'pessoas_extras'
+    AND newer.colaborador_id = older.colaborador_id
+    AND newer.id > older.id;
+
+-- Índices pelos padrões de acesso:
+--   (config_type, created_at)     itens em ordem de criação
+--   (config_type, colaborador_id) pessoas extras por colaborador (set_pessoas_extras)
+--   updated_at                    leitura incremental do espelho (id > ? OR updated_at >= ?)
+-- A chave única vale só para pessoas_extras (um registro por colaborador); itens
+-- continuam podendo ter várias linhas por colaborador, por isso ela usa uma
+-- coluna gerada que é NULL fora de pessoas_extras.
+ALTER TABLE {config_table}
+    ADD COLUMN pessoas_extras_colaborador_id INT
+        AS (IF(config_type = 'pessoas_extras', colaborador_id, NULL)) STORED,
+    DROP INDEX idx_config_type,
+    DROP INDEX idx_colaborador_id,
+    ADD INDEX idx_config_type_created_at (config_type, created_at),
+    ADD INDEX idx_config_type_colaborador (config_type, colaborador_id),
+    ADD INDEX idx_updated_at (updated_at),
+    ADD UNIQUE KEY uq_config_type_colaborador (config_type, pessoas_extras_colaborador_id);
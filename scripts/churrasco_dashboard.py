@@ -1,15 +1,24 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, date
 import time
-import pymysql
 import os
+import sys
 from dotenv import load_dotenv
 
+# Módulos compartilhados ficam na raiz do repositório
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Antes dos módulos compartilhados (alguns leem o ambiente no import)
 load_dotenv()
 
+from churrasco_db import read_roster, probe_pagamentos, fetch_payment_totals, get_breaker
+from churrasco_snapshot import get_poller, change_bus
+from churrasco_events import resolve_event, event_db_config, event_key, event_setting
+from churrasco_status import headline_month, month_label, status_table
+from churrasco_money import format_brl, payment_amount
+
 # Configuração da página
 st.set_page_config(
     page_title="🔥 ChurrasCode - Dashboard de Pagamentos",
@@ -20,10 +29,6 @@ st.set_page_config(
 
 if 'last_update' not in st.session_state:
     st.session_state.last_update = datetime.now()
-if 'data_cache' not in st.session_state:
-    st.session_state.data_cache = None
-if 'error_cache' not in st.session_state:
-    st.session_state.error_cache = None
 
 # CSS customizado para deixar mais bonito
 st.markdown("""
@@ -102,59 +107,134 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Evento exibido (?evento=<id>); pollers e caches ficam no escopo dele
+EVENT_ID = resolve_event(st.query_params.get('evento'))
+DB_CONFIG = event_db_config(EVENT_ID)
+# Colunas de mês do evento (PAYMENT_MONTHS / EVENT_<ID>_PAYMENT_MONTHS), na ordem configurada
+MESES_PAGAMENTO = list(DB_CONFIG['PAYMENT_MONTHS'])
+# Valor mensal por colaborador, em centavos (PAYMENT_AMOUNT)
+VALOR_MENSAL = payment_amount(DB_CONFIG)
+
+def pagamentos_table(config):
+    return f"{config['DB_NAME']}.{config['DB_TABLE']}"
+
+def fetch_pagamentos(config):
+    """Consulta a tabela de pagamentos (executada pelo poller em segundo plano)"""
+    # Pool compartilhado do processo; apenas as colunas exibidas, com dtypes compactos
+    return read_roster(pagamentos_table(config), config['PAYMENT_MONTHS'], config=config, order_by=None)
+
+def fetch_totais(config):
+    """KPIs e gráficos: contagem e soma por mês calculadas no MySQL (uma linha)"""
+    return fetch_payment_totals(pagamentos_table(config), config['PAYMENT_MONTHS'], config=config)
+
+def totais_poller():
+    """Poller compartilhado dos totais (cada chamada mantém o poller ativo)"""
+    config = DB_CONFIG
+    return get_poller(
+        event_key(EVENT_ID, 'confra_pagamentos_totais'), lambda: fetch_totais(config),
+        interval=int(os.getenv('DB_REFRESH_INTERVAL', 5)), persist=True
+    )
+
+def load_totais():
+    """Snapshot compartilhado dos totais: (totais, versão)"""
+    snapshot = totais_poller().get(timeout=10)
+    if snapshot is None or snapshot.data is None:
+        return None, 0
+    return snapshot.data, snapshot.version
+
+def probe_pagamentos_table(config):
+    """Sonda de mudança: evita reler a tabela quando nada mudou"""
+    return probe_pagamentos(pagamentos_table(config), config['PAYMENT_MONTHS'], config=config)
+
+def pagamentos_poller():
+    """Poller compartilhado dos pagamentos (cada chamada mantém o poller ativo)"""
+    config = DB_CONFIG
+    return get_poller(
+        event_key(EVENT_ID, 'confra_pagamentos'), lambda: fetch_pagamentos(config),
+        interval=int(os.getenv('DB_REFRESH_INTERVAL', 5)), probe=lambda: probe_pagamentos_table(config), persist=True
+    )
+
 def load_data_from_database():
-    try:
-        conn = pymysql.connect(
-            host=os.getenv('DB_HOST'),
-            user=os.getenv('DB_USER'),
-            password=os.getenv('DB_PASSWORD'),
-            database=os.getenv('DB_DATABASE'),
-            port=int(os.getenv('DB_PORT')),
-            cursorclass=pymysql.cursors.DictCursor
-        )
-        
-        with conn.cursor() as cursor:
-            sql = f"SELECT * FROM {os.getenv('DB_DATABASE')}.confra_pagamentos;"
-            cursor.execute(sql)
-            resultados = cursor.fetchall()
-            
-            # Converter para DataFrame
-            df = pd.DataFrame(resultados)
-            return df, None
-            
-    except Exception as e:
-        return None, str(e)
-    finally:
-        if 'conn' in locals():
-            conn.close()
+    """Lê o snapshot compartilhado do processo: (df, erro, horário da consulta, versão, desatualizado)"""
+    snapshot = pagamentos_poller().get(timeout=10)
+    if snapshot is None:
+        return None, "Tempo esgotado aguardando a primeira consulta ao banco", None, 0, False
+    return snapshot.data, snapshot.error, snapshot.fetched_at, snapshot.version, snapshot.is_stale
 
 def days_until_churrasco():
     today = date.today()
     current_year = today.year
     
-    # Data do evento: 6 de dezembro do ano atual
-    target_date = date(current_year, 12, 6)
+    # Dia e mês do evento (EVENT_DATE do evento exibido), no ano atual
+    event_day = datetime.strptime(event_setting(EVENT_ID, 'EVENT_DATE', '2025-12-06'), "%Y-%m-%d")
+    target_date = date(current_year, event_day.month, event_day.day)
     
     # Se já passou a data deste ano, calcular para o próximo ano
     if today > target_date:
-        target_date = date(current_year + 1, 12, 6)
+        target_date = date(current_year + 1, event_day.month, event_day.day)
     
     delta = target_date - today
     return max(0, delta.days), target_date
 
+@st.cache_data(max_entries=32, show_spinner=False)
+def build_charts(event, version, pagamentos_por_mes, total_colaboradores, mes_destaque):
+    """Gráficos de barras e pizza para uma versão do snapshot"""
+    # Preparar dados para o gráfico (rótulos a partir das colunas configuradas)
+    meses_nomes = [month_label(mes) for mes in pagamentos_por_mes]
+    valores = list(pagamentos_por_mes.values())
+    
+    fig_bar = px.bar(
+        x=meses_nomes,
+        y=valores,
+        title="Evolução dos Pagamentos",
+        color=valores,
+        color_continuous_scale="Oranges"
+    )
+    fig_bar.update_layout(
+        showlegend=False,
+        xaxis_title="Mês",
+        yaxis_title="Quantidade de Pagamentos"
+    )
+    
+    pagos = pagamentos_por_mes[mes_destaque]
+    pendentes = total_colaboradores - pagos
+    
+    fig_pie = px.pie(
+        values=[pagos, pendentes],
+        names=['Pagos 💚', 'Pendentes 🔴'],
+        title=f"Situação dos Pagamentos de {month_label(mes_destaque)}",
+        color_discrete_sequence=['#28a745', '#dc3545']
+    )
+    return fig_bar, fig_pie
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def build_result_df(event, version, current_month, _df, meses_cols):
+    """Tabela de status por colaborador para uma versão do snapshot (matriz vetorizada)"""
+    return status_table(
+        _df, list(meses_cols), ("✅ Pago", "❌ Pendente", "❌ Pendente"), current_month,
+        columns={'ID': 'colaborador_id', 'Nome': 'nome_colaborador'}
+    )
+
 current_time = datetime.now()
-time_diff = (current_time - st.session_state.last_update).total_seconds()
 
-if time_diff >= 60 or st.session_state.data_cache is None:
-    # Carregar novos dados
-    new_df, new_error = load_data_from_database()
-    st.session_state.data_cache = new_df
-    st.session_state.error_cache = new_error
-    st.session_state.last_update = current_time
+# Dados do snapshot compartilhado (o poller do processo é quem consulta o MySQL)
+df, error, last_sync, data_version, stale = load_data_from_database()
+last_sync = last_sync or current_time
+
+st.session_state.last_update = current_time
 
-# Usar dados do cache
-df = st.session_state.data_cache
-error = st.session_state.error_cache
+@st.fragment(run_every=float(os.getenv('CHANGE_WATCH_INTERVAL', 2)))
+def watch_data_changes():
+    """Reexecuta o dashboard só quando o poller publicou uma nova versão (sem consultar o MySQL)"""
+    # Tela aberta conta como leitura: os pollers não param por inatividade
+    seen = change_bus.versions([pagamentos_poller().name, totais_poller().name])
+    if 'change_bus_seen' not in st.session_state:
+        st.session_state.change_bus_seen = seen
+    elif seen != st.session_state.change_bus_seen:
+        st.session_state.change_bus_seen = seen
+        st.rerun()
+
+watch_data_changes()
 
 # Header principal
 st.markdown("""
@@ -166,15 +246,19 @@ st.markdown("""
 
 st.markdown("""
 <div class="refresh-info">
-    <strong>🔄 Auto-refresh:</strong> Os dados são atualizados automaticamente a cada minuto | 
+    <strong>🔄 Auto-refresh:</strong> A tela é atualizada assim que um pagamento muda no banco | 
     Última atualização: <strong>{}</strong>
 </div>
-""".format(st.session_state.last_update.strftime('%H:%M:%S')), unsafe_allow_html=True)
+""".format(last_sync.strftime('%H:%M:%S')), unsafe_allow_html=True)
 
-if error:
+if error and df is None:
     st.error(f"❌ Erro ao conectar com o banco de dados: {error}")
     st.stop()
 
+if stale and df is not None:
+    # Último snapshot bom (em disco ou em memória) enquanto o banco não responde
+    st.warning(f"⚠️ Dados desatualizados desde {last_sync.strftime('%H:%M')}" + (f" — {error}" if error else ""))
+
 if df is None or df.empty:
     st.warning("⚠️ Nenhum dado encontrado no banco de dados.")
     st.stop()
@@ -186,7 +270,9 @@ st.sidebar.markdown("## 🎯 Informações do Evento")
 st.sidebar.markdown(f"**📅 Data:** {event_date.strftime('%d de %B de %Y')}")
 st.sidebar.markdown("**👥 Participantes:** " + str(len(df)) + " devs")
 st.sidebar.markdown("**💰 Status:** Em andamento")
-st.sidebar.markdown(f"**🔄 Última sync:** {st.session_state.last_update.strftime('%H:%M:%S')}")
+st.sidebar.markdown(f"**🔄 Última sync:** {last_sync.strftime('%H:%M:%S')}")
+db_status = get_breaker(DB_CONFIG).status()
+st.sidebar.markdown(f"**🛡️ Banco:** circuito {db_status['state']}" + (f" (nova tentativa em {db_status['retry_in']:.0f}s)" if db_status['retry_in'] else ""))
 
 st.sidebar.markdown("---")
 st.sidebar.markdown("## 🤖 Memes do Dia")
@@ -211,12 +297,18 @@ st.markdown(f"""
 # Métricas principais
 col1, col2, col3, col4 = st.columns(4)
 
-# Calcular estatísticas
-total_colaboradores = len(df)
-meses = ['agosto_pago', 'setembro_pago', 'outubro_pago', 'novembro_pago', 'dezembro_pago']
-pagamentos_por_mes = {mes: df[mes].sum() for mes in meses}
+# Calcular estatísticas (agregadas no banco; a tabela completa fica só para a lista detalhada)
+totais, totais_version = load_totais()
+if totais is None:
+    totais = {'colaboradores': len(df), **{mes: int(df[mes].sum()) for mes in MESES_PAGAMENTO}}
+total_colaboradores = totais['colaboradores']
+meses = MESES_PAGAMENTO
+pagamentos_por_mes = {mes: totais[mes] for mes in meses}
 total_pagamentos = sum(pagamentos_por_mes.values())
-taxa_pagamento = (pagamentos_por_mes['agosto_pago'] / total_colaboradores) * 100
+# KPI principal: mês atual, se for um dos meses do evento; senão o primeiro
+mes_destaque = headline_month(meses, date.today().month)
+pagos_destaque = pagamentos_por_mes[mes_destaque]
+taxa_pagamento = (pagos_destaque / total_colaboradores) * 100 if total_colaboradores else 0.0
 
 with col1:
     st.metric(
@@ -227,16 +319,16 @@ with col1:
 
 with col2:
     st.metric(
-        label="💰 Pagamentos Agosto",
-        value=f"{pagamentos_por_mes['agosto_pago']}/{total_colaboradores}",
+        label=f"💰 Pagamentos {month_label(mes_destaque)}",
+        value=f"{pagos_destaque}/{total_colaboradores}",
         delta=f"{taxa_pagamento:.1f}%"
     )
 
 with col3:
     st.metric(
         label="🔥 Total Arrecadado",
-        value=f"R$ {pagamentos_por_mes['agosto_pago'] * 50:.2f}",
-        delta="Estimativa R$ 50/pessoa"
+        value=format_brl(total_pagamentos * VALOR_MENSAL),
+        delta=f"{format_brl(VALOR_MENSAL)}/pessoa por mês"
     )
 
 with col4:
@@ -246,77 +338,35 @@ with col4:
         delta="Cobrando galera! 😅"
     )
 
-# Gráficos
+if not total_colaboradores:
+    # Tabela vazia (ou totais ainda sem linhas): nada para graficar
+    st.info("📭 Nenhum colaborador cadastrado para este evento ainda.")
+    st.stop()
+
+# Gráficos (reaproveitados enquanto o snapshot não muda)
+fig_bar, fig_pie = build_charts(EVENT_ID, totais_version, pagamentos_por_mes, total_colaboradores, mes_destaque)
 col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("📊 Pagamentos por Mês")
-    
-    # Preparar dados para o gráfico
-    meses_nomes = ['Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
-    valores = [pagamentos_por_mes[mes] for mes in meses]
-    
-    fig_bar = px.bar(
-        x=meses_nomes,
-        y=valores,
-        title="Evolução dos Pagamentos",
-        color=valores,
-        color_continuous_scale="Oranges"
-    )
-    fig_bar.update_layout(
-        showlegend=False,
-        xaxis_title="Mês",
-        yaxis_title="Quantidade de Pagamentos"
-    )
     st.plotly_chart(fig_bar, use_container_width=True, key="bar_chart")
 
 with col2:
-    st.subheader("🥧 Status Agosto")
-    
-    pagos = pagamentos_por_mes['agosto_pago']
-    pendentes = total_colaboradores - pagos
-    
-    fig_pie = px.pie(
-        values=[pagos, pendentes],
-        names=['Pagos 💚', 'Pendentes 🔴'],
-        title="Situação dos Pagamentos de Agosto",
-        color_discrete_sequence=['#28a745', '#dc3545']
-    )
+    st.subheader(f"🥧 Status {month_label(mes_destaque)}")
     st.plotly_chart(fig_pie, use_container_width=True, key="pie_chart")
 
 # Lista detalhada dos colaboradores
 st.subheader("👨‍💻 Lista de Colaboradores e Status de Pagamentos")
 
-# Preparar dados para exibição
-display_df = df.copy()
-meses_display = ['Agosto', 'Setembro', 'Outubro', 'Novembro', 'Dezembro']
-meses_cols = ['agosto_pago', 'setembro_pago', 'outubro_pago', 'novembro_pago', 'dezembro_pago']
-
-# Criar DataFrame para exibição
-result_data = []
-for _, row in display_df.iterrows():
-    row_data = {
-        'ID': row['colaborador_id'],
-        'Nome': row['nome_colaborador']
-    }
-    
-    for mes_display, mes_col in zip(meses_display, meses_cols):
-        status = "✅ Pago" if row[mes_col] == 1 else "❌ Pendente"
-        row_data[mes_display] = status
-    
-    result_data.append(row_data)
-
-result_df = pd.DataFrame(result_data)
+# Criar DataFrame para exibição (colunas nativas do st.dataframe, sem Styler)
+meses_cols = tuple(MESES_PAGAMENTO)
+result_df = build_result_df(EVENT_ID, data_version, date.today().month, df, meses_cols)
 
-def highlight_status(val):
-    if "✅" in str(val):
-        return 'background-color: #d4edda; color: #155724'
-    elif "❌" in str(val):
-        return 'background-color: #f8d7da; color: #721c24'
-    return ''
-
-styled_df = result_df.style.map(highlight_status, subset=meses_display)
-st.dataframe(styled_df, use_container_width=True, hide_index=True, key="colaboradores_table")
+st.dataframe(
+    result_df,
+    column_config={mes: st.column_config.TextColumn(month_label(mes)) for mes in meses_cols},
+    use_container_width=True, hide_index=True, key="colaboradores_table"
+)
 
 # Seção de insights
 st.subheader("🧠 Insights do Dashboard")
@@ -326,9 +376,9 @@ col1, col2 = st.columns(2)
 with col1:
     st.info(f"""
     **📈 Análise Atual:**
-    - {pagamentos_por_mes['agosto_pago']} de {total_colaboradores} devs já pagaram agosto
+    - {pagos_destaque} de {total_colaboradores} devs já pagaram {month_label(mes_destaque).lower()}
     - Taxa de pagamento: {taxa_pagamento:.1f}%
-    - Faltam {total_colaboradores - pagamentos_por_mes['agosto_pago']} pagamentos
+    - Faltam {total_colaboradores - pagos_destaque} pagamentos
     """)
 
 with col2:
@@ -339,10 +389,6 @@ with col2:
     else:
         st.error("🚨 Alerta: Poucos pagamentos! Hora de fazer aquele PR no grupo! 😅")
 
-if time_diff >= 60:
-    time.sleep(2)  # Pequena pausa para evitar refresh muito rápido
-    st.rerun()
-
 # Footer divertido
 st.markdown("---")
 st.markdown(f"""
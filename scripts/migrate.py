@@ -0,0 +1,210 @@
+"""Aplica as migrações de schema de migrations/ e confere os índices das consultas.
+
+Cada arquivo migrations/NNN_descricao.sql é aplicado uma única vez por
+conjunto de tabelas que ele altera (tabela schema_migrations, coluna target).
+Os nomes de tabela vêm da configuração do evento: {payments_table} (DB_TABLE)
+e {config_table} (CONFIG_TABLE); eventos que compartilham tabelas (sem
+sobrescrita, ou sobrescrevendo só uma delas) não reaplicam a migração.
+
+Com --explain, roda EXPLAIN nas consultas que os apps fazem e indica se cada
+uma usa índice; leituras completas por definição (lista de colaboradores,
+sondas, totais) aparecem como tal.
+
+Uso:
+    python scripts/migrate.py [--event ID | --all-events] [--dry-run] [--explain [--strict]]
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+
+from dotenv import load_dotenv
+
+# Módulos compartilhados ficam na raiz do repositório
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+load_dotenv()
+
+from sqlalchemy import text
+
+from churrasco_db import (
+    config_probe_sql, config_table, fetch_all, get_engine, pagamentos_probe_sql, pagamentos_totals_sql, roster_sql,
+)
+from churrasco_events import default_event, event_db_config, list_events
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'migrations')
+
+SCHEMA_MIGRATIONS_DDL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    event VARCHAR(64) NOT NULL,
+    version INT NOT NULL,
+    name VARCHAR(255) NOT NULL,
+    target VARCHAR(512) NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (event, version)
+)
+"""
+
+
+def load_migrations():
+    """[(versão, nome, sql)] em ordem de versão"""
+    migrations = []
+    for path in sorted(glob.glob(os.path.join(MIGRATIONS_DIR, '*.sql'))):
+        name = os.path.basename(path)
+        match = re.match(r'(\d+)_', name)
+        if not match:
+            continue
+        with open(path, encoding='utf-8') as f:
+            migrations.append((int(match.group(1)), name, f.read()))
+    return migrations
+
+
+def split_statements(sql):
+    """Comandos de um arquivo .sql (sem comentários de linha), separados por ';'"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [statement.strip() for statement in '\n'.join(lines).split(';') if statement.strip()]
+
+
+def table_names(config):
+    return {
+        'payments_table': f"{config['DB_NAME']}.{config['DB_TABLE']}",
+        'config_table': f"{config['DB_NAME']}.{config_table(config)}",
+    }
+
+
+def migration_target(sql, tables):
+    """Tabelas (já resolvidas) que a migração altera: identificam onde ela já foi aplicada"""
+    return ','.join(sorted(name for key, name in tables.items() if f"{{{key}}}" in sql))
+
+
+def applied_migrations(conn, migrations):
+    """{(target, versão)} já aplicados, em qualquer evento"""
+    columns = {row[0] for row in conn.execute(text("SHOW COLUMNS FROM schema_migrations"))}
+    if 'target' not in columns:
+        conn.execute(text("ALTER TABLE schema_migrations ADD COLUMN target VARCHAR(512) NULL AFTER name"))
+    sources = {version: sql for version, _, sql in migrations}
+    applied = set()
+    for event, version, target in conn.execute(text("SELECT event, version, target FROM schema_migrations")):
+        if target is None and version in sources:
+            # Registros anteriores à coluna target: tabelas pela configuração do evento
+            target = migration_target(sources[version], table_names(event_db_config(event)))
+        applied.add((target, version))
+    return applied
+
+
+def migrate(event, dry_run=False, planned=None):
+    """Aplica as migrações pendentes do evento; retorna quantas foram aplicadas.
+
+    `planned` acumula (target, versão) já tratados nesta execução, para que um
+    --dry-run com --all-events não liste duas vezes a mesma tabela.
+    """
+    config = event_db_config(event)
+    tables = table_names(config)
+    engine = get_engine(config)
+    migrations = load_migrations()
+    planned = planned if planned is not None else set()
+
+    with engine.begin() as conn:
+        conn.execute(text(SCHEMA_MIGRATIONS_DDL))
+        applied = applied_migrations(conn, migrations) | planned
+
+    pending = [
+        (version, name, sql) for version, name, sql in migrations
+        if (migration_target(sql, tables), version) not in applied
+    ]
+    for version, name, sql in pending:
+        target = migration_target(sql, tables)
+        planned.add((target, version))
+        statements = split_statements(sql.format(**tables))
+        print(f"[{event}] {name} ({target})")
+        if dry_run:
+            for statement in statements:
+                print(f"{statement};\n")
+            continue
+        # DDL no MySQL faz commit implícito: cada migração registra a versão ao final
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+            conn.execute(
+                text(
+                    "INSERT INTO schema_migrations (event, version, name, target) "
+                    "VALUES (:event, :version, :name, :target)"
+                ),
+                {'event': event, 'version': version, 'name': name, 'target': target}
+            )
+    if not pending:
+        print(f"[{event}] schema em dia")
+    return len(pending)
+
+
+def app_queries(config):
+    """(nome, sql, parâmetros, leitura completa por definição) das consultas dos apps"""
+    tables = table_names(config)
+    payments, config_rows = tables['payments_table'], tables['config_table']
+    months = config['PAYMENT_MONTHS']
+    return [
+        ('lista de colaboradores', roster_sql(payments, months), {}, True),
+        ('sonda de pagamentos', pagamentos_probe_sql(payments, ['colaborador_id', 'nome_colaborador'] + months), {}, True),
+        ('totais por mês', pagamentos_totals_sql(payments, months), {}, True),
+        ('itens por data', f"SELECT * FROM {config_rows} WHERE config_type = 'item' ORDER BY created_at", {}, False),
+        ('pessoas extras', f"SELECT * FROM {config_rows} WHERE config_type = 'pessoas_extras'", {}, False),
+        (
+            'pessoas extras por colaborador',
+            f"SELECT id FROM {config_rows} WHERE config_type = 'pessoas_extras' AND colaborador_id IN (1, 2, 3)",
+            {}, False
+        ),
+        ('linha por id', f"SELECT * FROM {config_rows} WHERE id = 1", {}, False),
+        (
+            'espelho incremental',
+            f"SELECT * FROM {config_rows} WHERE id > :since_id OR updated_at >= NOW() - INTERVAL 1 MINUTE",
+            {'since_id': 0}, False
+        ),
+        ('sonda de confra_config', config_probe_sql(config_rows), {}, True),
+    ]
+
+
+def explain(event):
+    """Imprime o plano de cada consulta; retorna as que fazem scan completo sem necessidade"""
+    config = event_db_config(event)
+    full_scans = []
+    print(f"\n[{event}] EXPLAIN das consultas dos apps")
+    for name, sql, params, full_read in app_queries(config):
+        plan = fetch_all(f"EXPLAIN {sql}", params, config=config)
+        keys = [row.get('key') for row in plan if row.get('key')]
+        scan = any(row.get('type') == 'ALL' for row in plan)
+        if keys and not scan:
+            verdict = f"índice {', '.join(keys)}"
+        elif full_read:
+            verdict = "leitura completa (esperada)"
+        else:
+            verdict = "SCAN COMPLETO"
+            full_scans.append(name)
+        rows = sum(int(row.get('rows') or 0) for row in plan)
+        print(f"  {name:<32} type={plan[0].get('type')!s:<12} rows={rows:<8} {verdict}")
+    return full_scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrações de schema do churrasco")
+    parser.add_argument('--event', default=default_event(), help="evento (tenant) a migrar")
+    parser.add_argument('--all-events', action='store_true', help="migra todos os eventos de EVENTS")
+    parser.add_argument('--dry-run', action='store_true', help="apenas imprime o SQL pendente")
+    parser.add_argument('--explain', action='store_true', help="confere com EXPLAIN se as consultas usam índice")
+    parser.add_argument('--strict', action='store_true', help="com --explain, sai com erro se houver scan completo")
+    args = parser.parse_args()
+
+    events = list_events() if args.all_events else [args.event]
+    full_scans, planned = [], set()
+    for event in events:
+        migrate(event, dry_run=args.dry_run, planned=planned)
+        if args.explain and not args.dry_run:
+            full_scans += explain(event)
+
+    if full_scans and args.strict:
+        print(f"\nConsultas sem índice: {', '.join(full_scans)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Migra confra_pagamentos (uma coluna por mês) para o layout long.
+
+Cria a tabela de períodos (colaborador_id, period, paid_at, amount) e copia
+cada flag de mês = 1 como uma linha. A tabela original continua sendo a lista
+de colaboradores (id e nome); as colunas de mês não são removidas.
+
+Depois de conferir os totais impressos, defina PAYMENTS_LAYOUT=long (ou
+EVENT_<ID>_PAYMENTS_LAYOUT=long). Tabelas, meses e ano vêm da configuração do
+evento (EVENT_<ID>_DB_TABLE, EVENT_<ID>_PAYMENTS_TABLE etc.).
+
+Uso:
+    python scripts/migrate_pagamentos_long.py [--event ID | --all-events] [--dry-run] [--amount 63.07]
+"""
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Módulos compartilhados ficam na raiz do repositório
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+load_dotenv()
+
+from sqlalchemy import text
+
+from churrasco_db import fetch_payment_totals, get_engine, payment_periods, periods_table
+from churrasco_events import default_event, event_db_config, list_events
+
+PERIODS_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    colaborador_id INT NOT NULL,
+    period CHAR(7) NOT NULL COMMENT 'AAAA-MM',
+    paid_at DATETIME NULL,
+    amount DECIMAL(10,2) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_colaborador_period (colaborador_id, period),
+    INDEX idx_period_colaborador (period, colaborador_id)
+)
+"""
+
+
+def migration_statements(table, payments_table, periods, amount):
+    """(sql, parâmetros) na ordem de execução; INSERT IGNORE torna a migração repetível"""
+    statements = [(PERIODS_DDL.format(table=payments_table), {})]
+    for mes, period in periods.items():
+        statements.append((
+            f"INSERT IGNORE INTO {payments_table} (colaborador_id, period, paid_at, amount) "
+            f"SELECT colaborador_id, :period, NULL, :amount FROM {table} WHERE {mes} = 1",
+            {'period': period, 'amount': amount}
+        ))
+    return statements
+
+
+def migrate_event(event, amount, dry_run=False):
+    """Migra os pagamentos de um evento; retorna True se os totais dos dois layouts conferem"""
+    config = event_db_config(event)
+    table = f"{config['DB_NAME']}.{config['DB_TABLE']}"
+    payments_table = periods_table(table, config)
+    months = config['PAYMENT_MONTHS']
+    periods = payment_periods(months, config['PAYMENT_YEAR'])
+    statements = migration_statements(table, payments_table, periods, amount)
+
+    print(f"[{event}] {table} -> {payments_table}")
+    if dry_run:
+        for sql, params in statements:
+            print(f"{sql.strip()};  -- {params}" if params else f"{sql.strip()};")
+        return True
+
+    with get_engine(config).begin() as conn:
+        for sql, params in statements:
+            result = conn.execute(text(sql), params)
+            if params:
+                print(f"{params['period']}: {result.rowcount} pagamentos copiados")
+
+    # Conferência: os dois layouts devem produzir os mesmos totais
+    wide = fetch_payment_totals(table, months, config={**config, 'PAYMENTS_LAYOUT': 'wide'})
+    long = fetch_payment_totals(table, months, config={**config, 'PAYMENTS_LAYOUT': 'long'})
+    for key in wide:
+        status = 'ok' if wide[key] == long.get(key) else 'DIFERENTE'
+        print(f"{key:>16}: wide={wide[key]:>4} long={long.get(key, 0):>4} {status}")
+    return wide == long
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migra os pagamentos para o layout (colaborador, período)")
+    parser.add_argument('--event', default=default_event(), help="evento (tenant) a migrar")
+    parser.add_argument('--all-events', action='store_true', help="migra todos os eventos de EVENTS")
+    parser.add_argument('--amount', default=os.getenv('PAYMENT_AMOUNT', '63.07'), help="valor de cada pagamento migrado")
+    parser.add_argument('--dry-run', action='store_true', help="apenas imprime o SQL")
+    args = parser.parse_args()
+
+    events = list_events() if args.all_events else [args.event]
+    # Eventos sem sobrescrita de tabela compartilham as tabelas do padrão: migra cada par uma vez
+    migrated, failed = set(), []
+    for event in events:
+        config = event_db_config(event)
+        tables = (config['DB_NAME'], config['DB_TABLE'], periods_table(config['DB_TABLE'], config))
+        if tables in migrated:
+            print(f"[{event}] mesmas tabelas de um evento já migrado")
+            continue
+        migrated.add(tables)
+        if not migrate_event(event, args.amount, dry_run=args.dry_run):
+            failed.append(event)
+
+    if failed:
+        print(f"Totais diferentes em: {', '.join(failed)}")
+        sys.exit(1)
+    if not args.dry_run:
+        print("Migração conferida. Defina PAYMENTS_LAYOUT=long para ler o novo layout.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Ida e volta de snapshots em Arrow IPC (serviço de snapshots e disco)."""
+from datetime import datetime
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('pyarrow')
+pytest.importorskip('sqlalchemy')
+
+from churrasco_db import NAME_DTYPE, compact_roster  # noqa: E402
+from churrasco_snapshot import decode_snapshot, encode_snapshot  # noqa: E402
+
+MONTHS = ['agosto_pago', 'setembro_pago']
+
+
+def test_roster_dtypes_round_trip():
+    df = compact_roster(pd.DataFrame({
+        'colaborador_id': [1, 2, 300],
+        'nome_colaborador': ['Ana', 'João', 'Zé'],
+        'agosto_pago': [1, 0, None],
+        'setembro_pago': [0, 1, 1],
+    }), MONTHS)
+    fetched_at = datetime(2025, 8, 1, 12, 30)
+
+    data, decoded_at = decode_snapshot(encode_snapshot(df, fetched_at))
+
+    assert decoded_at == fetched_at
+    assert data.dtypes.to_dict() == df.dtypes.to_dict()
+    assert str(data['nome_colaborador'].dtype) == str(pd.Series(dtype=NAME_DTYPE).dtype)
+    assert all(data[mes].dtype == 'int8' for mes in MONTHS)
+    pd.testing.assert_frame_equal(data, df)
+
+
+def test_categorical_round_trip():
+    df = pd.DataFrame({'status': pd.Categorical(['pago', 'vencido', 'pago'])})
+
+    data, _ = decode_snapshot(encode_snapshot(df, datetime(2025, 8, 1)))
+
+    assert isinstance(data['status'].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(data, df)